@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_session, engine, pool_stats
+from backend.app.timescale import storage_stats
+from backend.app.profiling import ProfiledRoute, profile_store, render_profile
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=ProfiledRoute)
+
+@router.get("/storage")
+async def get_storage_stats(session: AsyncSession = Depends(get_session)):
+    """Chunk counts, sizes, compression ratios and policy jobs per hypertable."""
+    return await storage_stats(session)
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Connection pool occupancy and checkout wait statistics for this worker."""
+    return pool_stats.snapshot(engine.sync_engine.pool)
+
+@router.get("/profiles")
+async def list_profiles():
+    """Phase breakdowns of the most recently sampled requests on this worker, newest first."""
+    return [p.summary() for p in reversed(profile_store.profiles)]
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: int, format: str = Query("speedscope", pattern="^(speedscope|html)$")):
+    """Flamegraph of one sampled request: speedscope JSON or pyinstrument HTML."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (expired or on another worker)")
+    if profile.session is None:
+        raise HTTPException(status_code=409, detail="No stack samples for this request (pyinstrument missing or profiler busy)")
+    if format == "html":
+        return HTMLResponse(render_profile(profile, "html"))
+    return Response(
+        render_profile(profile, "speedscope"), media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'},
+    )
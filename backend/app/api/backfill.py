@@ -0,0 +1,39 @@
+import codecs
+from fastapi import APIRouter, HTTPException, Request
+from typing import Optional
+from backend.app.backfill import CsvRowParser, BackfillError, copy_rows
+from backend.app.metrics import INGEST_ROWS
+from backend.app.profiling import ProfiledRoute
+
+router = APIRouter(prefix="/backfill", tags=["backfill"], route_class=ProfiledRoute)
+
+TABLES = {"telemetry": "telemetry", "inference": "inference_results"}
+
+@router.post("/{kind}")
+async def backfill(kind: str, request: Request, node_id: Optional[str] = None):
+    """
+    Bulk-loads a CSV request body (header row first) via COPY.
+    Use node_id for files recorded by a single node that lack a node_id column.
+    """
+    if kind not in TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown backfill target {kind}")
+    parser = CsvRowParser(TABLES[kind], default_node_id=node_id)
+
+    async def batches():
+        # Parse the upload chunk by chunk instead of buffering the whole file
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        tail = ""
+        async for chunk in request.stream():
+            lines = (tail + decoder.decode(chunk)).split("\n")
+            tail = lines.pop()
+            yield parser.parse(lines)
+        if tail:
+            yield parser.parse([tail])
+
+    try:
+        stats = await copy_rows(TABLES[kind], batches())
+    except BackfillError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    INGEST_ROWS.labels(stats["table"]).inc(stats["inserted"])
+    print(f"[BACKFILL] {stats['rows']} {stats['table']} rows at {stats['rows_per_sec']} rows/s")
+    return stats
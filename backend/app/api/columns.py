@@ -0,0 +1,152 @@
+import orjson
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Type
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select, any_, bindparam, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import stream_rows
+from backend.app.downsample import downsample_indices, DOWNSAMPLE_MAX_ROWS
+from backend.app.api.etag import make_etag, conditional_json
+
+NDJSON_BATCH_ROWS = 1000   # rows fetched from the cursor per chunk
+DOWNSAMPLE_BATCH_ROWS = 10000   # rows per cursor fetch while building the LTTB arrays
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+def as_utc(ts: Optional[datetime]) -> Optional[datetime]:
+    # Query datetimes without an offset are UTC, so naive and aware bounds compare
+    return ts.replace(tzinfo=timezone.utc) if ts is not None and ts.tzinfo is None else ts
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel], required: Sequence[str]) -> List[str]:
+    """Columns requested via `?fields=a,b` (in schema order), always including the cursor/ETag keys."""
+    available = list(schema.model_fields)
+    if not fields:
+        return available
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = wanted - set(available)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))} (available: {', '.join(available)})"
+        )
+    wanted.update(required)
+    return [name for name in available if name in wanted]
+
+def rows_as_dicts(names: Sequence[str], rows) -> List[dict]:
+    # Plain tuples from a column select: no ORM identity map, no per-attribute encoding
+    return [dict(zip(names, row)) for row in rows]
+
+def oldest_first(stmt, names: Sequence[str], key):
+    """Wraps a newest-first LIMIT query so the database returns that page in ascending order."""
+    if key.key not in names:
+        stmt = stmt.add_columns(key)
+    page = stmt.subquery()
+    return select(*[page.c[name] for name in names]).order_by(page.c[key.key].asc())
+
+def ndjson_response(stmt, names: Sequence[str]) -> StreamingResponse:
+    """One JSON object per line, encoded batch by batch off a server-side cursor."""
+    async def lines():
+        async for rows in stream_rows(stmt, NDJSON_BATCH_ROWS):
+            yield b"".join(orjson.dumps(dict(zip(names, row))) + b"\n" for row in rows)
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def history_query(model, names: Sequence[str], node_id: str, limit: int,
+                  since=None, start=None, end=None, whole_range: bool = False):
+    """
+    Time-series history for one node, always oldest first.
+
+    Without a time window this is the newest `limit` rows. With since/start/end
+    it is the oldest `limit` rows of the window, or all of them when
+    `whole_range` is set (the caller downsamples). limit=0 means no cap.
+    """
+    stmt = select(*[getattr(model, name) for name in names]).where(model.node_id == node_id)
+    if since is None and start is None and end is None:
+        if not limit:
+            return stmt.order_by(model.time.asc())
+        return oldest_first(stmt.order_by(model.time.desc()).limit(limit), names, model.time)
+
+    if since is not None:
+        stmt = stmt.where(model.time > since)
+    if start is not None:
+        stmt = stmt.where(model.time >= start)
+    if end is not None:
+        stmt = stmt.where(model.time < end)
+    stmt = stmt.order_by(model.time.asc())
+    if limit and not whole_range:
+        stmt = stmt.limit(limit)
+    return stmt
+
+async def fetch_history(
+    session: AsyncSession, model, names: Sequence[str], node_id: str, *,
+    limit: int, since=None, start=None, end=None, max_points: Optional[int] = None, series: Sequence[str] = (),
+) -> List[dict]:
+    """History rows as dicts, LTTB-downsampled to `max_points` when given."""
+    stmt = history_query(model, names, node_id, limit, since, start, end, whole_range=max_points is not None)
+    if max_points is None:
+        return rows_as_dicts(names, (await session.execute(stmt)).all())
+
+    # Pass 1: only time and the series, streamed into NumPy arrays (no per-row tuples kept)
+    series = [name for name in series if name in names]
+    stmt = history_query(model, ["time", *series], node_id, limit, since, start, end, whole_range=True)
+    times, values, count = [], [], 0
+    async for rows in stream_rows(stmt.limit(DOWNSAMPLE_MAX_ROWS + 1), DOWNSAMPLE_BATCH_ROWS):
+        count += len(rows)
+        if count > DOWNSAMPLE_MAX_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Range holds more than {DOWNSAMPLE_MAX_ROWS} rows; narrow it or use /telemetry/rollup"
+            )
+        columns = list(zip(*rows))
+        # Integer microseconds: exact, so the picked rows can be looked up again by time
+        times.append(np.fromiter(((t - EPOCH) // MICROSECOND for t in columns[0]), dtype=np.int64, count=len(rows)))
+        values.append(np.array(columns[1:], dtype=np.float64).reshape(len(series), len(rows)))   # None -> nan
+    if not count:
+        return []
+    us = np.concatenate(times)
+    ys = np.concatenate(values, axis=1)
+
+    # CPU-bound: keep it off the event loop
+    keep = await run_in_threadpool(downsample_indices, (us - us[0]) / 1e6, list(ys), max_points)
+
+    # Pass 2: the requested columns for the picked rows only
+    picked = [EPOCH + MICROSECOND * int(v) for v in us[keep]]
+    stmt = (
+        select(*[getattr(model, name) for name in names])
+        # One array parameter, however large max_points is
+        .where(model.node_id == node_id, model.time == any_(bindparam("picked", picked, type_=ARRAY(DateTime(timezone=True)))))
+        .order_by(model.time.asc())
+    )
+    return rows_as_dicts(names, (await session.execute(stmt)).all())
+
+async def history_response(
+    request: Request, session: AsyncSession, model, schema: Type[BaseModel], node_id: str, *,
+    limit: int, fields: Optional[str], format: str,
+    since=None, start=None, end=None, max_points: Optional[int] = None, series: Sequence[str] = (),
+):
+    """Shared body of the telemetry/inference history endpoints (JSON with ETag, NDJSON, or LTTB-downsampled)."""
+    if limit == 0 and format != "ndjson":
+        raise HTTPException(status_code=400, detail="limit=0 requires format=ndjson")
+    if max_points is not None and format == "ndjson":
+        raise HTTPException(status_code=400, detail="max_points requires format=json")
+    since, start, end = as_utc(since), as_utc(start), as_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    names = parse_fields(fields, schema, required=["time"])
+    if format == "ndjson":
+        stmt = history_query(model, names, node_id, limit, since, start, end)
+        await session.close()   # the stream uses its own connection
+        return ndjson_response(stmt, names)
+
+    rows = await fetch_history(
+        session, model, names, node_id,
+        limit=limit, since=since, start=start, end=end, max_points=max_points, series=series,
+    )
+    etag = make_etag(node_id, names, max_points, len(rows), rows[0]["time"] if rows else None, rows[-1]["time"] if rows else None)
+    return conditional_json(request, rows, etag)
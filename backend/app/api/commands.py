@@ -1,21 +1,128 @@
-from fastapi import APIRouter, Depends
+import os
+import asyncio
+from uuid import UUID
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, text, func, or_, and_
 from backend.app.database import get_session
 from backend.app.models import Command
-from backend.app.schemas import CommandCreate, CommandResponse
+from backend.app.schemas import CommandCreate, CommandResponse, CommandComplete
+from backend.app.notify import command_signals, COMMAND_CHANNEL
+from backend.app.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/commands", tags=["commands"])
+router = APIRouter(prefix="/commands", tags=["commands"], route_class=ProfiledRoute)
+
+# Upper bound for ?wait=, kept below common proxy/read timeouts
+MAX_LONG_POLL_WAIT = 30
+
+# A claimed command that isn't acked/completed within this window is handed out again
+COMMAND_VISIBILITY_TIMEOUT = float(os.getenv("COMMAND_VISIBILITY_TIMEOUT", "120"))
+# The firmware never acks, so commands are delivered once by default; raise this only for acking clients
+COMMAND_MAX_DELIVERIES = int(os.getenv("COMMAND_MAX_DELIVERIES", "1"))
 
 @router.post("/", response_model=CommandResponse)
 async def queue_command(data: CommandCreate, session: AsyncSession = Depends(get_session)):
     cmd = Command(node_id=data.node_id, command_type=data.command_type, params=data.params)
     session.add(cmd)
+    # Delivered on commit to every worker's listener
+    await session.execute(text("SELECT pg_notify(:channel, :node_id)"), {"channel": COMMAND_CHANNEL, "node_id": data.node_id})
     await session.commit()
+    command_signals.notify(data.node_id)
     return {"command_id": cmd.command_id, "status": "pending"}
 
-@router.get("/pending")
-async def get_pending_commands(node_id: str, session: AsyncSession = Depends(get_session)):
-    stmt = select(Command).where(Command.node_id == node_id, Command.status == "pending")
+async def _claim_pending(session: AsyncSession, node_id: str):
+    """
+    Atomically marks deliverable commands as `sent` and returns them.
+
+    SKIP LOCKED lets concurrent polls (retries, several workers) split the queue
+    instead of both receiving the same command. Un-acked commands that used up
+    their deliveries are moved to the terminal `expired` state first.
+    """
+    redeliver_before = func.now() - timedelta(seconds=COMMAND_VISIBILITY_TIMEOUT)
+    await session.execute(
+        update(Command)
+        .where(
+            Command.node_id == node_id,
+            Command.status == "sent",
+            Command.sent_at < redeliver_before,
+            Command.attempts >= COMMAND_MAX_DELIVERIES,
+        )
+        .values(status="expired", completed_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    claimable = (
+        select(Command.command_id)
+        .where(
+            Command.node_id == node_id,
+            or_(
+                Command.status == "pending",
+                and_(
+                    Command.status == "sent",
+                    Command.sent_at < redeliver_before,
+                    Command.attempts < COMMAND_MAX_DELIVERIES,
+                ),
+            ),
+        )
+        .order_by(Command.created_at)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(Command)
+        .where(Command.command_id.in_(claimable.scalar_subquery()))
+        .values(status="sent", sent_at=func.now(), attempts=Command.attempts + 1)
+        .returning(Command)
+        .execution_options(synchronize_session=False)
+    )
     result = await session.execute(stmt)
-    return result.scalars().all()
+    commands = result.scalars().all()
+    await session.commit()
+    return sorted(commands, key=lambda c: c.created_at)
+
+@router.get("/pending")
+async def get_pending_commands(
+    node_id: str,
+    wait: float = Query(0, ge=0, le=MAX_LONG_POLL_WAIT, description="Long-poll: seconds to wait for a new command"),
+    session: AsyncSession = Depends(get_session)
+):
+    # Subscribe before querying so a command queued in between still wakes us
+    with command_signals.subscribe(node_id) as wakeup:
+        commands = await _claim_pending(session, node_id)
+        if commands or wait <= 0:
+            return commands
+
+        # Hand the pooled connection back while parked
+        await session.close()
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            return []
+        return await _claim_pending(session, node_id)
+
+async def _set_status(session: AsyncSession, command_id: UUID, allowed_from, **values):
+    stmt = (
+        update(Command)
+        .where(Command.command_id == command_id, Command.status.in_(allowed_from))
+        .values(**values)
+        .returning(Command.status)
+    )
+    status = (await session.execute(stmt)).scalar_one_or_none()
+    await session.commit()
+    if status is None:
+        current = await session.get(Command, command_id)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Unknown command")
+        raise HTTPException(status_code=409, detail=f"Command is already {current.status}")
+    return {"command_id": command_id, "status": status}
+
+@router.post("/{command_id}/ack", response_model=CommandResponse)
+async def ack_command(command_id: UUID, session: AsyncSession = Depends(get_session)):
+    """Device confirms receipt; stops redelivery while it executes."""
+    return await _set_status(session, command_id, ("pending", "sent"), status="acked")
+
+@router.post("/{command_id}/complete", response_model=CommandResponse)
+async def complete_command(command_id: UUID, data: CommandComplete, session: AsyncSession = Depends(get_session)):
+    return await _set_status(
+        session, command_id, ("pending", "sent", "acked"),
+        status=data.status, completed_at=datetime.utcnow()
+    )
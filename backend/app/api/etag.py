@@ -0,0 +1,16 @@
+import hashlib
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+def make_etag(*parts) -> str:
+    """Weak validator built from a cheap summary of the rows (count + boundary keys)."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def conditional_json(request: Request, content, etag: str) -> Response:
+    """Returns 304 when the client already holds this exact result; `content` must be orjson-serializable."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content, headers=headers)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Optional
+from backend.app.export import FORMATS, export_query, export_chunks
+from backend.app.profiling import ProfiledRoute
+from backend.app.api.columns import as_utc
+
+router = APIRouter(prefix="/export", tags=["export"], route_class=ProfiledRoute)
+
+@router.get("/{kind}")
+async def export_rows(
+    kind: str,
+    format: str = Query("arrow", pattern="^(arrow|parquet|csv)$"),
+    node_id: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on time"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on time"),
+):
+    """
+    Streams telemetry or inference rows as an Arrow file, Parquet or CSV.
+
+    Rows come off a server-side cursor in EXPORT_BATCH_ROWS batches, so the
+    full result is never held in memory. Load with pd.read_feather,
+    pd.read_parquet or pd.read_csv.
+    """
+    if kind not in ("telemetry", "inference"):
+        raise HTTPException(status_code=404, detail="Export kind must be telemetry or inference")
+    start, end = as_utc(start), as_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    media_type, extension = FORMATS[format]
+    filename = f"{kind}-{node_id or 'all'}.{extension}"
+    return StreamingResponse(
+        export_chunks(kind, format, export_query(kind, node_id, start, end)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
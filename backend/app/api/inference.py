@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from backend.app.database import get_session
 from backend.app.models import InferenceResult
-from backend.app.schemas import InferenceCreate
+from backend.app.schemas import InferenceCreate, InferenceRead
+from backend.app.buffer import write_buffer
+from backend.app.registry import node_registry
+from backend.app.events import event_broker
+from backend.app.latest import latest_cache, read_latest
+from backend.app.metrics import INGEST_ROWS
+from backend.app.profiling import ProfiledRoute
+from backend.app.api.columns import history_response
 from datetime import datetime
+from typing import List, Optional
 
-router = APIRouter(prefix="/inference", tags=["inference"])
+router = APIRouter(prefix="/inference", tags=["inference"], route_class=ProfiledRoute)
+
+INFERENCE_SERIES = ("confidence", "anomaly_score")
 
 @router.post("/")
 async def create_inference(data: InferenceCreate, session: AsyncSession = Depends(get_session)):
-    entry = InferenceResult(
+    row = dict(
         time=data.timestamp or datetime.utcnow(),
         node_id=data.node_id,
         model_type=data.model_type,
@@ -19,12 +28,40 @@ async def create_inference(data: InferenceCreate, session: AsyncSession = Depend
         anomaly_score=data.anomaly_score,
         raw_outputs=data.raw_outputs
     )
-    session.add(entry)
+    if write_buffer.running:
+        write_buffer.submit("inference_results", row)
+        INGEST_ROWS.labels("inference_results").inc()
+        latest_cache.update("inference", row)
+        event_broker.publish("inference", row)
+        return {"status": "ok"}
+
+    await node_registry.ensure([data.node_id])
+    session.add(InferenceResult(**row))
     await session.commit()
+    INGEST_ROWS.labels("inference_results").inc()
+    latest_cache.update("inference", row)
+    event_broker.publish("inference", row)
     return {"status": "ok"}
 
 @router.get("/latest")
 async def get_latest_inference(node_id: str, session: AsyncSession = Depends(get_session)):
-    stmt = select(InferenceResult).where(InferenceResult.node_id == node_id).order_by(InferenceResult.time.desc()).limit(1)
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    return await read_latest(session, "inference", node_id)
+
+@router.get("/", response_model=List[InferenceRead])
+async def get_inference_history(
+    request: Request,
+    node_id: str,
+    limit: int = Query(100, ge=0, description="Row cap; 0 = no cap (ndjson only)"),
+    since: Optional[datetime] = Query(None, description="Only rows newer than this timestamp (delta fetch)"),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on time"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on time"),
+    max_points: Optional[int] = Query(None, ge=3, description="Read the whole range and LTTB-downsample it to at most this many rows"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (time is always included)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams rows off a server-side cursor"),
+    session: AsyncSession = Depends(get_session)
+):
+    return await history_response(
+        request, session, InferenceResult, InferenceRead, node_id,
+        limit=limit, fields=fields, format=format,
+        since=since, start=start, end=end, max_points=max_points, series=INFERENCE_SERIES,
+    )
@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from backend.app.database import get_session
-from backend.app.models import DeviceLog, Node
-from backend.app.schemas import CommandCreate # Using generic model
+from backend.app.models import DeviceLog
+from backend.app.schemas import CommandCreate, DeviceLogRead # Using generic model
+from backend.app.buffer import write_buffer
+from backend.app.registry import node_registry
+from backend.app.events import event_broker
+from backend.app.metrics import INGEST_ROWS
+from backend.app.api.etag import make_etag, conditional_json
+from backend.app.api.columns import parse_fields, rows_as_dicts, oldest_first, ndjson_response, as_utc
+from backend.app.profiling import ProfiledRoute
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional
 
-router = APIRouter(prefix="/logs", tags=["logs"])
+router = APIRouter(prefix="/logs", tags=["logs"], route_class=ProfiledRoute)
+
+# log_id is not an index key, so deltas are bounded on created_at to skip old (compressed) chunks.
+# Slack covers rows stamped before the cursor row but inserted after it (write-behind, other workers)
+DELTA_SLACK = timedelta(minutes=5)
+# Bound used when the client only sends after_id
+DELTA_LOOKBACK = timedelta(days=1)
 
 class LogCreate(BaseModel):
     node_id: str
@@ -15,40 +29,56 @@ class LogCreate(BaseModel):
 
 @router.post("/")
 async def create_log(data: LogCreate, session: AsyncSession = Depends(get_session)):
-    # --- AUTO-REGISTRATION FIX ---
-    # Check if node exists, create if not
-    node = await session.get(Node, data.node_id)
-    if not node:
-        # Register new node
-        new_node = Node(
-            node_id=data.node_id, 
-            name=f"Auto-Reg: {data.node_id}",
-            last_seen_at=datetime.utcnow()
-        )
-        session.add(new_node)
-        # Flush to ensure FK constraint is satisfied immediately
-        await session.flush()
-    else:
-        # Update heartbeat
-        node.last_seen_at = datetime.utcnow()
-    # -----------------------------
-
-    log = DeviceLog(node_id=data.node_id, message=data.message)
+    # Stamp now so a buffered log keeps its arrival time, not its flush time
+    row = {"node_id": data.node_id, "message": data.message, "created_at": datetime.utcnow()}
+    if write_buffer.running:
+        write_buffer.submit("device_logs", row)
+        INGEST_ROWS.labels("device_logs").inc()
+        event_broker.publish("log", row)
+        return {"status": "ok"}
+
+    # Auto-registers unknown nodes; the heartbeat is batched by the registry
+    await node_registry.ensure([data.node_id])
+
+    log = DeviceLog(**row)
     session.add(log)
     await session.commit()
+    INGEST_ROWS.labels("device_logs").inc()
+    event_broker.publish("log", dict(row, log_id=log.log_id))
     return {"status": "ok"}
 
-@router.get("/")
+def logs_query(names: List[str], node_id: str, limit: int, after_id: Optional[int] = None, after_time: Optional[datetime] = None):
+    """The newest `limit` logs (or those after the `after_id` cursor), oldest first."""
+    stmt = select(*[getattr(DeviceLog, name) for name in names]).where(DeviceLog.node_id == node_id)
+    if after_id is not None:
+        since = after_time - DELTA_SLACK if after_time is not None else func.now() - DELTA_LOOKBACK
+        stmt = (
+            stmt.where(DeviceLog.created_at >= since, DeviceLog.log_id > after_id)
+            .order_by(DeviceLog.log_id.asc())
+        )
+        return stmt.limit(limit) if limit else stmt
+    if limit:
+        return oldest_first(stmt.order_by(DeviceLog.created_at.desc()).limit(limit), names, DeviceLog.created_at)
+    return stmt.order_by(DeviceLog.created_at.asc())
+
+@router.get("/", response_model=List[DeviceLogRead])
 async def get_logs(
+    request: Request,
     node_id: str, 
-    limit: int = 50, 
+    limit: int = Query(50, ge=0, description="Row cap; 0 = no cap (ndjson only)"),
+    after_id: Optional[int] = Query(None, description="Only logs with log_id above this cursor (delta fetch)"),
+    after_time: Optional[datetime] = Query(None, description="created_at of the after_id row; without it deltas look back one day"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (log_id is always included)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams rows off a server-side cursor"),
     session: AsyncSession = Depends(get_session)
 ):
-    stmt = (
-        select(DeviceLog)
-        .where(DeviceLog.node_id == node_id)
-        .order_by(DeviceLog.created_at.desc())
-        .limit(limit)
-    )
-    result = await session.execute(stmt)
-    return list(reversed(result.scalars().all()))
+    if limit == 0 and format != "ndjson":
+        raise HTTPException(status_code=400, detail="limit=0 requires format=ndjson")
+    names = parse_fields(fields, DeviceLogRead, required=["log_id"])
+    stmt = logs_query(names, node_id, limit, after_id, as_utc(after_time))
+    if format == "ndjson":
+        await session.close()   # the stream uses its own connection
+        return ndjson_response(stmt, names)
+    rows = rows_as_dicts(names, (await session.execute(stmt)).all())
+    etag = make_etag(node_id, names, len(rows), rows[0]["log_id"] if rows else None, rows[-1]["log_id"] if rows else None)
+    return conditional_json(request, rows, etag)
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from backend.app.database import get_session
+from backend.app.latest import fetch_latest, read_latest
+from backend.app.models import Telemetry
+from backend.app.schemas import TelemetryRead, DeviceLogRead
+from backend.app.api.columns import fetch_history, rows_as_dicts, as_utc
+from backend.app.api.etag import make_etag, conditional_json
+from backend.app.api.telemetry import TELEMETRY_SERIES
+from backend.app.api.logs import logs_query
+from backend.app.profiling import ProfiledRoute
+
+router = APIRouter(prefix="/nodes", tags=["nodes"], route_class=ProfiledRoute)
+
+@router.get("/latest")
+async def get_fleet_latest(session: AsyncSession = Depends(get_session)):
+    """Fleet overview: every node with its latest telemetry and inference, in one query."""
+    return await fetch_latest(session)
+
+@router.get("/{node_id}/snapshot")
+async def get_node_snapshot(
+    request: Request,
+    node_id: str,
+    limit: int = Query(100, ge=1, description="Newest telemetry rows, when no start is given"),
+    start: Optional[datetime] = Query(None, description="Chart window start (replaces limit)"),
+    max_points: Optional[int] = Query(None, ge=3, description="LTTB-downsample the chart window to this many rows"),
+    log_limit: int = Query(50, ge=1),
+    session: AsyncSession = Depends(get_session)
+):
+    """Everything the node dashboard shows (latest values, chart series, recent logs) in one round trip."""
+    start = as_utc(start)
+    telemetry = await fetch_history(
+        session, Telemetry, list(TelemetryRead.model_fields), node_id,
+        # A window replaces limit: all of it, or max_points of it
+        limit=0 if start is not None else limit, start=start, max_points=max_points, series=TELEMETRY_SERIES,
+    )
+    log_names = list(DeviceLogRead.model_fields)
+    logs = rows_as_dicts(log_names, (await session.execute(logs_query(log_names, node_id, log_limit))).all())
+    latest = {
+        "telemetry": await read_latest(session, "telemetry", node_id),
+        "inference": await read_latest(session, "inference", node_id),
+    }
+
+    etag = make_etag(
+        node_id, limit, start, max_points, log_limit, len(telemetry),
+        telemetry[-1]["time"] if telemetry else None,
+        logs[-1]["log_id"] if logs else None,
+        latest["inference"]["time"] if latest["inference"] else None,
+    )
+    return conditional_json(request, {"node_id": node_id, "latest": latest, "telemetry": telemetry, "logs": logs}, etag)
@@ -0,0 +1,62 @@
+import asyncio
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from backend.app.events import event_broker, Event
+from backend.app.profiling import ProfiledRoute
+
+router = APIRouter(prefix="/stream", tags=["stream"], route_class=ProfiledRoute)
+
+KEEPALIVE_SECONDS = 15
+
+def _format(event: Event) -> str:
+    return f"id: {event_broker.event_id(event)}\nevent: {event.kind}\ndata: {event.data}\n\n"
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    node_id: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Last event id received, to resume after"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events feed of newly ingested telemetry, inference and log rows.
+    Resume with ?cursor=<last id> (browsers send Last-Event-ID automatically on reconnect).
+    Without a cursor the feed starts at the live tail. A cursor this worker
+    can't resume (restart, another worker, backlog overrun) gets a `reset`
+    event and then the live tail: refetch current state, then keep reading.
+    """
+    cursor = last_event_id or cursor
+
+    async def events():
+        # Subscribe before replaying the backlog so nothing falls in the gap
+        with event_broker.subscribe(node_id) as sub:
+            backlog = event_broker.since(cursor, node_id) if cursor else []
+            if backlog is None:
+                yield "event: reset\ndata: {}\n\n"
+                backlog = []
+            last_seq = 0
+            for event in backlog:
+                last_seq = event.seq
+                yield _format(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break  # dropped for falling behind
+                if event.seq <= last_seq:
+                    continue  # already sent from the backlog
+                last_seq = event.seq
+                yield _format(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,23 +1,34 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Body, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import ValidationError
 from backend.app.database import get_session
-from backend.app.models import Telemetry, Node
-from backend.app.schemas import TelemetryCreate
-from datetime import datetime
+from backend.app.models import Telemetry
+from backend.app.schemas import TelemetryCreate, TelemetryBatchResponse, TelemetryRead
+from backend.app.registry import node_registry
+from backend.app.events import event_broker
+from backend.app.latest import latest_cache, read_latest
+from backend.app.metrics import INGEST_ROWS
+from backend.app.api.columns import history_response, as_utc
+from backend.app.timescale import pick_rollup, rollup_query
+from backend.app.buffer import write_buffer, MAX_INSERT_ROWS
+from backend.app.profiling import ProfiledRoute
+from datetime import datetime, timedelta, timezone
+import re
+from typing import Any, Dict, List, Optional
 
-router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+BUCKET_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+MAX_ROLLUP_BUCKETS = 10000
+
+# Numeric columns that drive LTTB point selection
+TELEMETRY_SERIES = ("temperature_c", "humidity_pct", "battery_mv", "rssi_dbm")
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"], route_class=ProfiledRoute)
 
 @router.post("/")
 async def create_telemetry(data: TelemetryCreate, session: AsyncSession = Depends(get_session)):
-    node = await session.get(Node, data.node_id)
-    if not node:
-        node = Node(node_id=data.node_id, name=f"Node {data.node_id}", last_seen_at=datetime.utcnow())
-        session.add(node)
-    else:
-        node.last_seen_at = datetime.utcnow()
-
-    entry = Telemetry(
+    row = dict(
         time=data.timestamp or datetime.utcnow(),
         node_id=data.node_id,
         temperature_c=data.temperature_c,
@@ -26,30 +37,156 @@ async def create_telemetry(data: TelemetryCreate, session: AsyncSession = Depend
         rssi_dbm=data.rssi_dbm,
         error_flags=data.error_flags
     )
-    session.add(entry)
+    if write_buffer.running:
+        # Nodes are registered by the buffer flush
+        write_buffer.submit("telemetry", row)
+        INGEST_ROWS.labels("telemetry").inc()
+        latest_cache.update("telemetry", row)
+        event_broker.publish("telemetry", row)
+        return {"status": "ok"}
+
+    await node_registry.ensure([data.node_id])
+    session.add(Telemetry(**row))
     await session.commit()
+    INGEST_ROWS.labels("telemetry").inc()
+    latest_cache.update("telemetry", row)
+    event_broker.publish("telemetry", row)
     return {"status": "ok"}
 
+def _utc_key(node_id: str, ts: datetime):
+    # Naive timestamps are stored as UTC; aware datetimes compare by instant
+    return (node_id, as_utc(ts))
+
+@router.post("/batch", response_model=TelemetryBatchResponse)
+async def create_telemetry_batch(
+    rows: List[Dict[str, Any]] = Body(...),
+    session: AsyncSession = Depends(get_session)
+):
+    """Ingests many readings (any mix of nodes/timestamps) with one node upsert and one multi-row insert."""
+    if len(rows) > MAX_INSERT_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_INSERT_ROWS} rows")
+
+    now = datetime.utcnow()
+    results = []
+    values = []
+    index_by_key = {}
+
+    # 1. Validate each row on its own so one bad reading doesn't sink the batch
+    for i, raw in enumerate(rows):
+        try:
+            data = TelemetryCreate.model_validate(raw)
+        except ValidationError as e:
+            err = e.errors()[0]
+            field = ".".join(str(p) for p in err["loc"])
+            results.append({"index": i, "status": "rejected", "error": f"{field}: {err['msg']}"})
+            continue
+
+        ts = data.timestamp or now
+        key = _utc_key(data.node_id, ts)
+        if key in index_by_key:
+            # Same (time, node_id) primary key twice in one batch
+            results.append({"index": i, "status": "duplicate", "error": "duplicate of row %d" % index_by_key[key]})
+            continue
+
+        index_by_key[key] = i
+        results.append({"index": i, "status": "accepted", "error": None})
+        values.append({
+            "time": ts,
+            "node_id": data.node_id,
+            "temperature_c": data.temperature_c,
+            "humidity_pct": data.humidity_pct,
+            "battery_mv": data.battery_mv,
+            "rssi_dbm": data.rssi_dbm,
+            "error_flags": data.error_flags,
+        })
+
+    # 2. One node upsert + one multi-row insert for the whole batch
+    if values:
+        await node_registry.ensure((v["node_id"] for v in values), now)
+        stmt = (
+            pg_insert(Telemetry)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=[Telemetry.time, Telemetry.node_id])
+            .returning(Telemetry.node_id, Telemetry.time)
+        )
+        inserted = {_utc_key(node_id, ts) for node_id, ts in (await session.execute(stmt)).all()}
+        await session.commit()
+        INGEST_ROWS.labels("telemetry").inc(len(inserted))
+
+        # Rows skipped by ON CONFLICT already exist in the table
+        for key, i in index_by_key.items():
+            if key not in inserted:
+                results[i] = {"index": i, "status": "duplicate", "error": "already stored"}
+
+        for key, row in zip(index_by_key, values):
+            if key in inserted:
+                latest_cache.update("telemetry", row)
+                event_broker.publish("telemetry", row)
+
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("accepted", "duplicate", "rejected")}
+    return {"accepted": counts["accepted"], "duplicates": counts["duplicate"], "rejected": counts["rejected"], "results": results}
+
 # --- THIS WAS MISSING ---
-@router.get("/")
+@router.get("/", response_model=List[TelemetryRead])
 async def get_telemetry_history(
+    request: Request,
     node_id: str, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=0, description="Row cap; 0 = no cap (ndjson only)"),
+    since: Optional[datetime] = Query(None, description="Only rows newer than this timestamp (delta fetch)"),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on time"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on time"),
+    max_points: Optional[int] = Query(None, ge=3, description="Read the whole range and LTTB-downsample it to at most this many rows"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (time is always included)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams rows off a server-side cursor"),
     session: AsyncSession = Depends(get_session)
 ):
-    stmt = (
-        select(Telemetry)
-        .where(Telemetry.node_id == node_id)
-        .order_by(Telemetry.time.desc())
-        .limit(limit)
+    # Without a window: the newest `limit` rows. With since/start/end: the oldest `limit`
+    # rows of the window, so clients can page forward. Always returned oldest first.
+    return await history_response(
+        request, session, Telemetry, TelemetryRead, node_id,
+        limit=limit, fields=fields, format=format,
+        since=since, start=start, end=end, max_points=max_points, series=TELEMETRY_SERIES,
     )
-    result = await session.execute(stmt)
-    # Return reversed (oldest first) so the graph draws left-to-right correctly
-    return list(reversed(result.scalars().all()))
 # ------------------------
 
 @router.get("/latest")
 async def get_latest_telemetry(node_id: str, session: AsyncSession = Depends(get_session)):
-    stmt = select(Telemetry).where(Telemetry.node_id == node_id).order_by(Telemetry.time.desc()).limit(1)
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    return await read_latest(session, "telemetry", node_id)
+
+def _parse_bucket(bucket: str) -> timedelta:
+    match = re.fullmatch(r"(\d+)([mhdw])", bucket.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise HTTPException(status_code=400, detail="bucket must look like 1m, 15m, 1h, 6h, 1d or 1w")
+    return timedelta(**{BUCKET_UNITS[match.group(2)]: int(match.group(1))})
+
+@router.get("/rollup")
+async def get_telemetry_rollup(
+    node_id: str,
+    bucket: str = "1h",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """Downsampled min/max/avg/count per bucket, served from the coarsest fitting continuous aggregate."""
+    width = _parse_bucket(bucket)
+    rollup = pick_rollup(width)
+    if rollup is None:
+        raise HTTPException(status_code=400, detail="bucket must be a multiple of 1m")
+
+    end = as_utc(end) or datetime.now(timezone.utc)
+    start = as_utc(start) or end - timedelta(days=7)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end - start) / width > MAX_ROLLUP_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"range spans more than {MAX_ROLLUP_BUCKETS} buckets")
+
+    result = await session.execute(
+        text(rollup_query(rollup.view)),
+        {"width": width, "node_id": node_id, "start": start, "end": end}
+    )
+    return {
+        "node_id": node_id,
+        "bucket": bucket,
+        "source": rollup.view,
+        "points": [dict(row) for row in result.mappings()],
+    }
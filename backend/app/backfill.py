@@ -0,0 +1,134 @@
+import csv
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence
+from backend.app.database import engine
+from backend.app.latest import latest_cache, LATEST_CACHE_ENABLED
+
+# Columns accepted per target table, in COPY order
+COLUMNS = {
+    "telemetry": ("time", "node_id", "temperature_c", "humidity_pct", "battery_mv", "rssi_dbm", "error_flags"),
+    "inference_results": ("time", "node_id", "model_type", "classification", "confidence", "anomaly_score", "raw_outputs"),
+}
+
+# Last-value cache section per table
+CACHE_KINDS = {"telemetry": "telemetry", "inference_results": "inference"}
+
+# Header aliases so exported datasets (e.g. training/D1_sensor_data.csv) load without editing
+ALIASES = {
+    "timestamp": "time",
+    "published_at": "time",
+    "tag_number": "node_id",
+    "temperature": "temperature_c",
+    "humidity": "humidity_pct",
+}
+
+class BackfillError(ValueError):
+    pass
+
+class CsvRowParser:
+    """Maps CSV lines onto a table's COPY columns. Values stay as text; PostgreSQL parses them during COPY."""
+
+    def __init__(self, table: str, default_node_id: Optional[str] = None):
+        if table not in COLUMNS:
+            raise BackfillError(f"Unknown table {table}")
+        self.columns = COLUMNS[table]
+        self.default_node_id = default_node_id
+        self.positions: Optional[List[Optional[int]]] = None
+
+    def _read_header(self, header: Sequence[str]):
+        names = [ALIASES.get(h.strip(), h.strip()) for h in header]
+        self.positions = [names.index(c) if c in names else None for c in self.columns]
+        if self.positions[0] is None:
+            raise BackfillError("CSV needs a time column (time, timestamp or published_at)")
+        if self.positions[1] is None and not self.default_node_id:
+            raise BackfillError("CSV has no node_id column; pass node_id explicitly")
+
+    def parse(self, lines: Iterable[str]) -> List[tuple]:
+        rows = []
+        for record in csv.reader(lines):
+            if not record:
+                continue
+            if self.positions is None:
+                self._read_header(record)
+                continue
+            row = tuple(
+                (record[p] or None) if p is not None and p < len(record) else None
+                for p in self.positions
+            )
+            if row[1] is None:
+                row = (row[0], self.default_node_id) + row[2:]
+            rows.append(row)
+        return rows
+
+async def copy_rows(table: str, batches: AsyncIterator[List[tuple]]) -> Dict[str, float]:
+    """
+    Streams rows into `table` through COPY.
+
+    Rows land in a temp staging table first, so a single INSERT ... SELECT can
+    register missing nodes and skip (time, node_id) duplicates in bulk. The
+    newest row of each touched node is then fed to the last-value cache.
+    """
+    columns = COLUMNS[table]
+    col_list = ", ".join(columns)
+    staging = f"_backfill_{table}"
+    started = time.perf_counter()
+    copied = 0
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        pg = raw.driver_connection  # psycopg.AsyncConnection
+        try:
+            async with pg.cursor() as cur:
+                await cur.execute(
+                    f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                async with cur.copy(f"COPY {staging} ({col_list}) FROM STDIN") as copy:
+                    async for batch in batches:
+                        for row in batch:
+                            await copy.write_row(row)
+                        copied += len(batch)
+
+                # Upsert missing nodes first so the hypertable FK holds
+                await cur.execute(f"""
+                    INSERT INTO nodes (node_id, name, last_seen_at, is_active)
+                    SELECT node_id, 'Node ' || node_id, max(time), TRUE FROM {staging} GROUP BY node_id
+                    ON CONFLICT (node_id) DO UPDATE
+                    SET last_seen_at = GREATEST(nodes.last_seen_at, EXCLUDED.last_seen_at)
+                """)
+                nodes = cur.rowcount
+
+                await cur.execute(
+                    f"INSERT INTO {table} ({col_list}) SELECT {col_list} FROM {staging} "
+                    f"ON CONFLICT DO NOTHING"
+                )
+                inserted = cur.rowcount
+
+                # One index probe per backfilled node, like fetch_latest
+                latest = []
+                if LATEST_CACHE_ENABLED:
+                    await cur.execute(f"""
+                        SELECT l.* FROM (SELECT DISTINCT node_id FROM {staging}) s
+                        CROSS JOIN LATERAL (
+                            SELECT {col_list} FROM {table} t WHERE t.node_id = s.node_id ORDER BY t.time DESC LIMIT 1
+                        ) l
+                    """)
+                    latest = await cur.fetchall()
+            await pg.commit()
+        except Exception:
+            await pg.rollback()
+            raise
+
+    # Newer-wins: a backfill of old data leaves live values alone
+    for row in latest:
+        latest_cache.update(CACHE_KINDS[table], dict(zip(columns, row)))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "table": table,
+        "rows": copied,
+        "inserted": inserted,
+        "duplicates": copied - inserted,
+        "nodes": nodes,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(copied / elapsed, 1) if elapsed > 0 else 0.0,
+    }
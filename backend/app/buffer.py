@@ -0,0 +1,118 @@
+import os
+import asyncio
+from typing import Dict, List
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from backend.app.database import AsyncSessionLocal
+from backend.app.models import Telemetry, InferenceResult, DeviceLog
+from backend.app.registry import node_registry
+
+# Write-behind is opt-in: handlers keep committing synchronously unless this is set
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_MAX_ROWS = int(os.getenv("WRITE_BEHIND_MAX_ROWS", "10000"))    # per-table queue bound
+WRITE_BEHIND_FLUSH_ROWS = int(os.getenv("WRITE_BEHIND_FLUSH_ROWS", "500"))  # size trigger
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))  # time trigger (s)
+WRITE_BEHIND_RETRIES = 3
+
+TABLES = {
+    "telemetry": Telemetry,
+    "inference_results": InferenceResult,
+    "device_logs": DeviceLog,
+}
+
+# Keeps one multi-row INSERT below PostgreSQL's 65535 bind-parameter limit
+MAX_INSERT_ROWS = 5000
+
+_STOP = object()
+
+class BufferFull(Exception):
+    """Raised when a per-table queue is at capacity (mapped to HTTP 503)."""
+
+    def __init__(self, table: str):
+        super().__init__(f"write-behind buffer full for {table}")
+        self.table = table
+
+class WriteBehindBuffer:
+    """Bounded per-table queues flushed to the database with bulk inserts."""
+
+    def __init__(self, max_rows: int, flush_rows: int, flush_interval: float):
+        self.max_rows = max_rows
+        self.flush_rows = max(1, min(flush_rows, MAX_INSERT_ROWS))
+        self.flush_interval = flush_interval
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.running = False
+
+    async def start(self):
+        self.queues = {table: asyncio.Queue(maxsize=self.max_rows) for table in TABLES}
+        self.tasks = [asyncio.create_task(self._run(table)) for table in TABLES]
+        self.running = True
+        print(f"[BUFFER] Write-behind enabled (max {self.max_rows} rows/table, "
+              f"flush every {self.flush_rows} rows or {self.flush_interval}s)")
+
+    async def stop(self):
+        """Stops accepting rows and drains everything already queued."""
+        if not self.running:
+            return
+        self.running = False
+        for queue in self.queues.values():
+            # Sentinel goes behind every accepted row, so FIFO order guarantees a full drain
+            await queue.put(_STOP)
+        await asyncio.gather(*self.tasks)
+        self.tasks = []
+        print("[BUFFER] Write-behind drained")
+
+    def submit(self, table: str, row: dict):
+        try:
+            self.queues[table].put_nowait(row)
+        except asyncio.QueueFull:
+            raise BufferFull(table)
+
+    def depth(self) -> Dict[str, int]:
+        return {table: queue.qsize() for table, queue in self.queues.items()}
+
+    async def _run(self, table: str):
+        queue = self.queues[table]
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+
+            # Collect until the size trigger fires or the time trigger expires
+            while len(batch) < self.flush_rows:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(table, batch)
+
+    async def _flush(self, table: str, rows: List[dict]):
+        model = TABLES[table]
+        for attempt in range(1, WRITE_BEHIND_RETRIES + 1):
+            try:
+                await node_registry.ensure(r["node_id"] for r in rows)
+                async with AsyncSessionLocal() as session:
+                    stmt = pg_insert(model).values(rows).on_conflict_do_nothing()
+                    await session.execute(stmt)
+                    await session.commit()
+                return
+            except Exception as e:
+                print(f"[BUFFER] Flush of {len(rows)} {table} rows failed (attempt {attempt}): {e}")
+                await asyncio.sleep(0.5 * attempt)
+        print(f"[BUFFER] Dropped {len(rows)} {table} rows after {WRITE_BEHIND_RETRIES} attempts")
+
+write_buffer = WriteBehindBuffer(WRITE_BEHIND_MAX_ROWS, WRITE_BEHIND_FLUSH_ROWS, WRITE_BEHIND_FLUSH_INTERVAL)
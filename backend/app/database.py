@@ -1,7 +1,12 @@
 import os
+import time
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import text
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import text, exc, event
+from backend.app.timescale import create_rollups, apply_policies
+from backend.app.metrics import DB_COMMIT_SECONDS, DB_POOL_CHECKOUT_SECONDS, DB_POOL_WAITS, instrument_engine
+from backend.app.profiling import track_queries
 
 # USER: postgres, PASS: happybees_dev, DB: happybees
 # These defaults now match the docker/podman command in README
@@ -16,16 +21,128 @@ DATABASE_URL = os.getenv(
     f"postgresql+psycopg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
-engine = create_async_engine(DATABASE_URL, echo=False)
-AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Pool sizing is per uvicorn worker: total connections = workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))        # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))        # seconds; -1 keeps connections forever
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+# Request sessions only: init_db, backfill COPY and export streams may legitimately run longer
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 = server default
+# psycopg prepares a statement after this many executions; "none" disables it (needed behind PgBouncer)
+DB_PREPARE_THRESHOLD = os.getenv("DB_PREPARE_THRESHOLD", "5")
+
+class PoolStats:
+    """Checkout counters for the engine pool, exported via /admin/pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0           # checkouts that found the pool at capacity
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, elapsed: float, waited: bool):
+        self.checkouts += 1
+        if waited:
+            self.waits += 1
+            DB_POOL_WAITS.inc()
+            self.wait_seconds += elapsed
+            self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
+
+    def snapshot(self, pool) -> dict:
+        capacity = pool.size() + pool._max_overflow if pool._max_overflow >= 0 else None
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(pool.checkedout() / capacity, 3) if capacity else None,
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(1000 * self.wait_seconds / self.waits, 2) if self.waits else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait_seconds, 2),
+        }
+
+pool_stats = PoolStats()
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times each checkout and counts the ones that had to wait."""
+
+    def _do_get(self):
+        at_capacity = self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            pool_stats.record(elapsed, at_capacity)
+            DB_POOL_CHECKOUT_SECONDS.observe(elapsed)
+
+def _connect_args() -> dict:
+    args = {}
+    if DB_PREPARE_THRESHOLD.lower() == "none":
+        args["prepare_threshold"] = None
+    else:
+        args["prepare_threshold"] = int(DB_PREPARE_THRESHOLD)
+    return args
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    poolclass=InstrumentedPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+)
+instrument_engine(engine.sync_engine)
+track_queries(engine.sync_engine)
+
+class InstrumentedSession(AsyncSession):
+    async def commit(self):
+        with DB_COMMIT_SECONDS.time():
+            await super().commit()
+
+AsyncSessionLocal = async_sessionmaker(engine, class_=InstrumentedSession, expire_on_commit=False)
 
 class Base(DeclarativeBase):
     pass
 
+@event.listens_for(Session, "after_begin")
+def _request_statement_timeout(session, transaction, connection):
+    # SET LOCAL ends with the transaction, so the pooled connection goes back unchanged
+    if DB_STATEMENT_TIMEOUT_MS > 0 and session.info.get("request"):
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+
 async def get_session() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
+    async with AsyncSessionLocal(info={"request": True}) as session:
         yield session
 
+async def stream_rows(stmt, batch_size: int):
+    """
+    Yields lists of rows from a server-side cursor.
+
+    The connection belongs to the generator, not the request, so it stays open
+    while a StreamingResponse is still sending and closes if the client leaves.
+    """
+    async with engine.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+def _create_missing_indexes(sync_conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
 async def init_db():
     """Initializes tables and TimescaleDB hypertables."""
     async with engine.begin() as conn:
@@ -34,10 +151,15 @@ async def init_db():
         
         # Create standard tables
         await conn.run_sync(Base.metadata.create_all)
+
+        # Columns/indexes added after the first release (create_all skips existing tables)
+        await conn.execute(text("ALTER TABLE commands ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0;"))
+        # Superseded by ix_device_logs_node_time; its INCLUDE (message) rejected long log lines
+        await conn.execute(text("DROP INDEX IF EXISTS ix_device_logs_node_created;"))
+        await conn.run_sync(_create_missing_indexes)
         
-        # Convert to hypertables (suppress error if they already exist)
-        try:
-            await conn.execute(text("SELECT create_hypertable('telemetry', 'time', if_not_exists => TRUE);"))
-            await conn.execute(text("SELECT create_hypertable('inference_results', 'time', if_not_exists => TRUE);"))
-        except Exception as e:
-            print(f"Hypertable notice (safe to ignore): {e}")
\ No newline at end of file
+        # Hypertables, chunk sizing, compression and retention (see timescale.HYPERTABLE_POLICIES)
+        await apply_policies(conn)
+
+        # Continuous aggregates for downsampled telemetry queries
+        await create_rollups(conn)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+from typing import Sequence
+import numpy as np
+
+# Rows a single downsampled request may read; wider ranges belong on /telemetry/rollup
+DOWNSAMPLE_MAX_ROWS = int(os.getenv("DOWNSAMPLE_MAX_ROWS", "1000000"))
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of the `n_out` points that best keep the shape of y(x).
+
+    Bucket averages come from cumulative sums in one pass; the remaining
+    per-bucket step (it depends on the previously picked point) is a NumPy
+    argmax over that bucket's triangle areas.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the interior points; first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    counts = edges[1:] - edges[:-1]
+    avg_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    avg_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+    # Third triangle vertex for bucket b is the average of bucket b + 1 (the last point for the final bucket)
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        areas = np.abs(
+            (x[a] - next_x[b]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (next_y[b] - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        selected[b + 1] = a
+    return selected
+
+def downsample_indices(x: np.ndarray, series: Sequence[np.ndarray], max_points: int) -> np.ndarray:
+    """
+    Sorted indices of at most `max_points` rows of a time-ordered series set.
+
+    `x` is time in seconds from the first row; each array in `series` holds one
+    column (nan for nulls). Each series that varies gets a share of the budget
+    and its own LTTB pass; the union of the picked rows is returned, so every
+    series keeps its peaks and troughs. Series often pick the same rows, so
+    the budget left over by that overlap is spent in one wider pass.
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    active = []
+    for y in series:
+        valid = np.flatnonzero(~np.isnan(y))
+        # All-null or constant series have no shape to keep and get no budget
+        if len(valid) and np.ptp(y[valid]) > 0:
+            active.append((valid, x[valid], y[valid]))
+    if not active:
+        return np.unique(np.linspace(0, n - 1, max_points).astype(np.int64))
+
+    def pick(share: int) -> np.ndarray:
+        return np.unique(np.concatenate([valid[lttb(xv, yv, share)] for valid, xv, yv in active]))
+
+    share = max(max_points // len(active), 3)
+    keep = pick(share)
+    if len(keep) < max_points and len(active) > 1:
+        wider = pick(min(share * max_points // len(keep), max_points))
+        if len(wider) <= max_points:
+            keep = wider
+    if len(keep) > max_points:
+        # Only when max_points < 3 per series: thin the union evenly
+        keep = keep[np.unique(np.linspace(0, len(keep) - 1, max_points).astype(np.int64))]
+    return keep
@@ -0,0 +1,133 @@
+import os
+import json
+import uuid
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, List, NamedTuple, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from backend.app.database import engine
+from backend.app.notify import pg_listener, PG_LISTEN_ENABLED, MAX_NOTIFY_PAYLOAD
+
+STREAM_BACKLOG = int(os.getenv("STREAM_BACKLOG", "1000"))         # events kept for cursor resume
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))    # per-subscriber buffer
+
+STREAM_CHANNEL = "stream_event"
+
+class Event(NamedTuple):
+    seq: int
+    node_id: str
+    kind: str   # "telemetry", "inference" or "log"
+    data: str   # JSON, serialized once for all subscribers
+
+class Subscription:
+    def __init__(self, node_id: Optional[str]):
+        self.node_id = node_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+class EventBroker:
+    """
+    Fan-out of freshly ingested rows to live stream subscribers.
+
+    With PG_LISTEN_ENABLED, published rows go out over NOTIFY and every worker
+    (this one included) delivers them from its listener, so a client sees all
+    ingests whichever worker it is connected to. Sequence numbers are per
+    process; event ids carry the process epoch so a foreign cursor is detected.
+    """
+
+    def __init__(self, backlog: int):
+        self.seq = 0
+        self.epoch = uuid.uuid4().hex[:8]
+        self.recent: Deque[Event] = deque(maxlen=backlog)
+        self.subscribers: Set[Subscription] = set()
+        self.outbox: List[str] = []
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def event_id(self, event: Event) -> str:
+        return f"{self.epoch}-{event.seq}"
+
+    def publish(self, kind: str, row: dict):
+        data = json.dumps(jsonable_encoder(row))
+        payload = f"{kind}\n{row['node_id']}\n{data}"
+        if self.task is None or len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            # No bridge (single worker), or too large for NOTIFY: this worker's subscribers only
+            self.deliver(kind, row["node_id"], data)
+            return
+        self.outbox.append(payload)
+        self.wakeup.set()
+
+    def on_notify(self, payload: str):
+        kind, node_id, data = payload.split("\n", 2)
+        self.deliver(kind, node_id, data)
+
+    def deliver(self, kind: str, node_id: str, data: str):
+        self.seq += 1
+        event = Event(self.seq, node_id, kind, data)
+        self.recent.append(event)
+        for sub in list(self.subscribers):
+            if sub.node_id is not None and sub.node_id != event.node_id:
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: cut it loose, the client resumes from its last event id
+                self.subscribers.discard(sub)
+                sub.queue.get_nowait()
+                sub.queue.put_nowait(None)
+
+    def since(self, cursor: str, node_id: Optional[str]) -> Optional[List[Event]]:
+        """Backlog after `cursor`; None if the cursor can't be resumed here."""
+        epoch, _, number = cursor.partition("-")
+        if epoch != self.epoch or not number.isdigit():
+            # Another worker's or an earlier process's cursor
+            return None
+        seq = int(number)
+        if seq > self.seq or (self.recent and seq < self.recent[0].seq - 1):
+            # Unknown, or older than the backlog: events were missed
+            return None
+        return [e for e in self.recent if e.seq > seq and (node_id is None or e.node_id == node_id)]
+
+    @contextmanager
+    def subscribe(self, node_id: Optional[str]):
+        sub = Subscription(node_id)
+        self.subscribers.add(sub)
+        try:
+            yield sub
+        finally:
+            self.subscribers.discard(sub)
+
+    async def start(self):
+        if PG_LISTEN_ENABLED:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            payloads, self.outbox = self.outbox, []
+            try:
+                # One round trip per batch; NOTIFYs from one transaction arrive in order
+                async with engine.begin() as conn:
+                    await conn.execute(
+                        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                        {"channel": STREAM_CHANNEL, "payloads": payloads}
+                    )
+            except Exception as e:
+                print(f"[STREAM] NOTIFY failed ({e}); delivering {len(payloads)} events locally")
+                for payload in payloads:
+                    self.on_notify(payload)
+
+event_broker = EventBroker(STREAM_BACKLOG)
+if PG_LISTEN_ENABLED:
+    pg_listener.on(STREAM_CHANNEL, event_broker.on_notify)
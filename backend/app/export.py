@@ -0,0 +1,113 @@
+import os
+from typing import AsyncIterator, Optional
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import select, cast, Text
+from backend.app.database import stream_rows
+from backend.app.models import Telemetry, InferenceResult
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "10000"))   # rows per cursor fetch / record batch
+
+# Arrow schema and source column per exported field
+EXPORTS = {
+    "telemetry": (Telemetry, [
+        ("time", pa.timestamp("us", tz="UTC"), Telemetry.time),
+        ("node_id", pa.string(), Telemetry.node_id),
+        ("temperature_c", pa.float64(), Telemetry.temperature_c),
+        ("humidity_pct", pa.float64(), Telemetry.humidity_pct),
+        ("battery_mv", pa.int32(), Telemetry.battery_mv),
+        ("rssi_dbm", pa.int32(), Telemetry.rssi_dbm),
+        ("error_flags", pa.int32(), Telemetry.error_flags),
+    ]),
+    "inference": (InferenceResult, [
+        ("time", pa.timestamp("us", tz="UTC"), InferenceResult.time),
+        ("node_id", pa.string(), InferenceResult.node_id),
+        ("model_type", pa.string(), InferenceResult.model_type),
+        ("classification", pa.string(), InferenceResult.classification),
+        ("confidence", pa.float64(), InferenceResult.confidence),
+        ("anomaly_score", pa.float64(), InferenceResult.anomaly_score),
+        # JSON text, rendered by PostgreSQL rather than re-encoded row by row
+        ("raw_outputs", pa.string(), cast(InferenceResult.raw_outputs, Text)),
+    ]),
+}
+
+FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "csv": ("text/csv", "csv"),
+}
+
+class _ChunkSink:
+    """
+    Write-only file object that hands its bytes back after every record batch.
+
+    tell() keeps counting across drains: the Arrow file and Parquet footers
+    store absolute offsets.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def _open_writer(fmt: str, sink, schema: pa.Schema):
+    if fmt == "arrow":
+        # IPC file format (Feather v2): pd.read_feather / pa.memory_map load it without copying
+        return pa.ipc.new_file(sink, schema)
+    if fmt == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    return pa_csv.CSVWriter(sink, schema)
+
+def export_query(kind: str, node_id: Optional[str], start: Optional[datetime], end: Optional[datetime]):
+    model, fields = EXPORTS[kind]
+    stmt = select(*[column for _, _, column in fields])
+    if node_id is not None:
+        # Served by the (node_id, time DESC) index
+        stmt = stmt.where(model.node_id == node_id).order_by(model.time)
+    else:
+        stmt = stmt.order_by(model.time, model.node_id)
+    if start is not None:
+        stmt = stmt.where(model.time >= start)
+    if end is not None:
+        stmt = stmt.where(model.time < end)
+    return stmt
+
+async def export_chunks(kind: str, fmt: str, stmt) -> AsyncIterator[bytes]:
+    """Encodes the query result batch by batch; memory stays bounded by EXPORT_BATCH_ROWS."""
+    fields = EXPORTS[kind][1]
+    schema = pa.schema([(name, type_) for name, type_, _ in fields])
+    sink = _ChunkSink()
+    writer = _open_writer(fmt, pa.PythonFile(sink, mode="w"), schema)
+
+    async for rows in stream_rows(stmt, EXPORT_BATCH_ROWS):
+        columns = list(zip(*rows))
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        )
+        writer.write_batch(batch)
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,178 @@
+import os
+import uuid
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+from sqlalchemy import select, true, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import engine
+from backend.app.models import Node, Telemetry, InferenceResult
+from backend.app.notify import pg_listener, MAX_NOTIFY_PAYLOAD
+
+LATEST_CACHE_ENABLED = os.getenv("LATEST_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Multi-worker deployments: broadcast which nodes changed so other workers drop stale entries
+LATEST_CACHE_INVALIDATE = os.getenv("LATEST_CACHE_INVALIDATE", "false").lower() in ("1", "true", "yes")
+LATEST_INVALIDATE_INTERVAL = float(os.getenv("LATEST_INVALIDATE_INTERVAL", "1.0"))
+
+LATEST_CHANNEL = "latest_invalidate"
+
+MISS = object()
+
+def _latest(model):
+    # Correlated LATERAL: one (node_id, time DESC) index probe per node instead of a DISTINCT ON scan
+    return (
+        select(model)
+        .where(model.node_id == Node.node_id)
+        .order_by(model.time.desc())
+        .limit(1)
+        .lateral()
+    )
+
+async def fetch_latest(session: AsyncSession, node_id: Optional[str] = None) -> List[dict]:
+    """Latest telemetry and inference for every node (or one node) in a single query."""
+    t = _latest(Telemetry)
+    i = _latest(InferenceResult)
+    stmt = (
+        select(
+            Node.node_id, Node.name, Node.last_seen_at, Node.is_active,
+            *[c.label(f"t_{c.name}") for c in t.c if c.name != "node_id"],
+            *[c.label(f"i_{c.name}") for c in i.c if c.name != "node_id"],
+        )
+        .select_from(Node)
+        .outerjoin(t, true())
+        .outerjoin(i, true())
+        .order_by(Node.node_id)
+    )
+    if node_id is not None:
+        stmt = stmt.where(Node.node_id == node_id)
+
+    nodes = []
+    for row in (await session.execute(stmt)).mappings():
+        telemetry = {k[2:]: v for k, v in row.items() if k.startswith("t_")}
+        inference = {k[2:]: v for k, v in row.items() if k.startswith("i_")}
+        nodes.append({
+            "node_id": row["node_id"],
+            "name": row["name"],
+            "last_seen_at": row["last_seen_at"],
+            "is_active": row["is_active"],
+            "telemetry": telemetry if telemetry["time"] is not None else None,
+            "inference": inference if inference["time"] is not None else None,
+        })
+    return nodes
+
+def _as_utc(ts: datetime) -> datetime:
+    # Ingested timestamps may be naive (stored as UTC); DB values are aware
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+class LastValueCache:
+    """
+    Latest telemetry/inference row per node, kept current by the ingest handlers.
+
+    Reads never touch PostgreSQL once a node is cached. With several workers,
+    LATEST_CACHE_INVALIDATE relays changed node IDs so peers re-read them.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, Dict[str, dict]] = {"telemetry": {}, "inference": {}}
+        self.dirty: Set[str] = set()
+        # Identifies this worker's own broadcasts (PIDs repeat across containers)
+        self.token = uuid.uuid4().hex[:12]
+        self.task: Optional[asyncio.Task] = None
+
+    def get(self, kind: str, node_id: str):
+        return self.values[kind].get(node_id, MISS)
+
+    def update(self, kind: str, row: dict):
+        """Called on ingest; out-of-order (backfilled) rows don't replace newer ones."""
+        if not LATEST_CACHE_ENABLED:
+            return
+        self.fill(kind, row)
+        if LATEST_CACHE_INVALIDATE:
+            self.dirty.add(row["node_id"])
+
+    def fill(self, kind: str, row: dict):
+        """Caches `row` unless a newer one is already cached (e.g. ingested while a DB read was in flight)."""
+        current = self.values[kind].get(row["node_id"])
+        time = _as_utc(row["time"])
+        if current is None or time >= current["time"]:
+            # Stored aware, like rows read back from the database
+            self.values[kind][row["node_id"]] = dict(row, time=time)
+
+    async def warm(self, session: AsyncSession):
+        for node in await fetch_latest(session):
+            for kind in ("telemetry", "inference"):
+                if node[kind] is not None:
+                    self.values[kind][node["node_id"]] = dict(node[kind], node_id=node["node_id"])
+        print(f"[CACHE] Warmed latest values for {len(self.values['telemetry'])} nodes")
+
+    def on_invalidate(self, payload: str):
+        token, _, node_ids = payload.partition(":")
+        if token == self.token:
+            return
+        for node_id in node_ids.split(","):
+            for values in self.values.values():
+                values.pop(node_id, None)
+
+    async def start(self):
+        if LATEST_CACHE_INVALIDATE:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _broadcast(self):
+        if not self.dirty:
+            return
+        node_ids, self.dirty = sorted(self.dirty), set()
+        payloads, current = [], []
+        for node_id in node_ids:
+            if current and len(",".join(current + [node_id])) > MAX_NOTIFY_PAYLOAD:
+                payloads.append(current)
+                current = []
+            current.append(node_id)
+        payloads.append(current)
+        async with engine.begin() as conn:
+            for chunk in payloads:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": LATEST_CHANNEL, "payload": f"{self.token}:{','.join(chunk)}"}
+                )
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(LATEST_INVALIDATE_INTERVAL)
+            try:
+                await self._broadcast()
+            except Exception as e:
+                print(f"[CACHE] Invalidation broadcast failed: {e}")
+
+latest_cache = LastValueCache()
+if LATEST_CACHE_INVALIDATE:
+    pg_listener.on(LATEST_CHANNEL, latest_cache.on_invalidate)
+
+async def read_latest(session: AsyncSession, kind: str, node_id: str) -> Optional[dict]:
+    """Serves /latest from the cache, falling back to (and filling from) the database."""
+    if LATEST_CACHE_ENABLED:
+        cached = latest_cache.get(kind, node_id)
+        if cached is not MISS:
+            return cached
+
+    model = Telemetry if kind == "telemetry" else InferenceResult
+    stmt = select(model).where(model.node_id == node_id).order_by(model.time.desc()).limit(1)
+    obj = (await session.execute(stmt)).scalar_one_or_none()
+    if obj is None:
+        # Not cached: arbitrary unknown node IDs must not grow the cache
+        return None
+    row = {c.name: getattr(obj, c.name) for c in model.__table__.columns}
+    if LATEST_CACHE_ENABLED:
+        latest_cache.fill(kind, row)
+        # A row ingested during the SELECT wins
+        return latest_cache.get(kind, node_id)
+    return row
+
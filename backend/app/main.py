@@ -1,20 +1,102 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-from .database import init_db
-from .api import telemetry, commands, inference, logs
+from datetime import timezone
+from sqlalchemy import select, func
+from .database import init_db, AsyncSessionLocal, engine, pool_stats
+from .models import Command, Node
+from .metrics import (
+    PrometheusMiddleware, render_metrics, COMMAND_QUEUE_DEPTH, NODE_LAST_SEEN, WRITE_BUFFER_DEPTH,
+    DB_POOL_CHECKED_OUT, DB_POOL_SATURATION,
+)
+from .profiling import ProfilingMiddleware
+from .buffer import write_buffer, BufferFull, WRITE_BEHIND_ENABLED
+from .registry import node_registry
+from .notify import pg_listener, PG_LISTEN_ENABLED
+from .latest import latest_cache, LATEST_CACHE_ENABLED
+from .events import event_broker
+from .api import telemetry, commands, inference, logs, nodes, backfill, stream, admin, export
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await node_registry.start()
+    if LATEST_CACHE_ENABLED:
+        async with AsyncSessionLocal() as session:
+            await latest_cache.warm(session)
+        await latest_cache.start()
+    if PG_LISTEN_ENABLED:
+        await pg_listener.start()
+    await event_broker.start()
+    if WRITE_BEHIND_ENABLED:
+        await write_buffer.start()
     yield
+    # Flush queued rows (which may queue heartbeats) before the last heartbeat flush
+    await write_buffer.stop()
+    await node_registry.stop()
+    await event_broker.stop()
+    await pg_listener.stop()
+    await latest_cache.stop()
 
 app = FastAPI(title="BeeWatch API", lifespan=lifespan)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(PrometheusMiddleware)
+
+@app.exception_handler(BufferFull)
+async def buffer_full_handler(request: Request, exc: BufferFull):
+    # Backpressure: devices retry on their next sync cycle
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={"Retry-After": "1"})
 
 app.include_router(telemetry.router, prefix="/api/v1")
 app.include_router(inference.router, prefix="/api/v1")
 app.include_router(commands.router, prefix="/api/v1")
 app.include_router(logs.router, prefix="/api/v1")
+app.include_router(nodes.router, prefix="/api/v1")
+app.include_router(backfill.router, prefix="/api/v1")
+app.include_router(stream.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
+app.include_router(export.router, prefix="/api/v1")
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+async def _refresh_gauges():
+    """Point-in-time gauges are computed on scrape rather than kept up to date on every request."""
+    for table, depth in write_buffer.depth().items():
+        WRITE_BUFFER_DEPTH.labels(table).set(depth)
+    pool = pool_stats.snapshot(engine.sync_engine.pool)
+    DB_POOL_CHECKED_OUT.set(pool["checked_out"])
+    DB_POOL_SATURATION.set(pool["saturation"] or 0)
+
+    try:
+        async with AsyncSessionLocal() as session:
+            pending = (await session.execute(
+                select(Command.node_id, func.count())
+                .where(Command.status == "pending")
+                .group_by(Command.node_id)
+            )).all()
+            seen = (await session.execute(
+                select(Node.node_id, Node.last_seen_at).where(Node.last_seen_at.is_not(None))
+            )).all()
+    except Exception as e:
+        print(f"[METRICS] Gauge refresh failed: {e}")
+        return
+
+    # Drained queues must drop to zero, not keep their last value
+    COMMAND_QUEUE_DEPTH.clear()
+    for node_id, count in pending:
+        COMMAND_QUEUE_DEPTH.labels(node_id).set(count)
+    # Heartbeats not yet flushed by the registry are newer than the table
+    last_seen = dict(seen)
+    last_seen.update(node_registry.pending)
+    for node_id, seen_at in last_seen.items():
+        if seen_at.tzinfo is None:
+            seen_at = seen_at.replace(tzinfo=timezone.utc)
+        NODE_LAST_SEEN.labels(node_id).set(seen_at.timestamp())
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    await _refresh_gauges()
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
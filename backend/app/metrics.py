@@ -0,0 +1,87 @@
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+# Latency buckets tuned for an API whose fast path is sub-millisecond cache hits
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "beewatch_http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+# SSE, export and NDJSON responses last as long as the client reads; kept out of REQUEST_LATENCY
+STREAM_DURATION = Histogram(
+    "beewatch_http_stream_duration_seconds", "Duration of streamed responses",
+    ["method", "route", "status"], buckets=(0.1, 1.0, 10.0, 60.0, 300.0, 900.0, 3600.0),
+)
+STREAMED_ROUTES = {"/api/v1/stream", "/api/v1/export/{kind}"}
+# SSE, NDJSON history and the /export formats (see export.FORMATS)
+STREAMED_MEDIA_TYPES = (
+    b"text/event-stream", b"application/x-ndjson",
+    b"application/vnd.apache.arrow.file", b"application/vnd.apache.parquet", b"text/csv",
+)
+INGEST_ROWS = Counter("beewatch_ingest_rows_total", "Rows accepted for ingest", ["table"])
+DB_QUERY_SECONDS = Histogram("beewatch_db_query_duration_seconds", "SQL statement execution time", buckets=LATENCY_BUCKETS)
+DB_COMMIT_SECONDS = Histogram("beewatch_db_commit_duration_seconds", "Session commit time", buckets=LATENCY_BUCKETS)
+DB_POOL_WAITS = Counter("beewatch_db_pool_waits", "Checkouts that found the pool at capacity")
+DB_POOL_CHECKOUT_SECONDS = Histogram("beewatch_db_pool_checkout_seconds", "Time to obtain a pooled connection", buckets=LATENCY_BUCKETS)
+
+# Scrape-time gauges; "mostrecent" keeps them meaningful in multiprocess mode
+COMMAND_QUEUE_DEPTH = Gauge("beewatch_command_queue_depth", "Commands waiting for delivery", ["node_id"], multiprocess_mode="mostrecent")
+NODE_LAST_SEEN = Gauge("beewatch_node_last_seen_timestamp_seconds", "Last time a node reported", ["node_id"], multiprocess_mode="mostrecent")
+WRITE_BUFFER_DEPTH = Gauge("beewatch_write_buffer_rows", "Rows queued in the write-behind buffer", ["table"], multiprocess_mode="mostrecent")
+DB_POOL_CHECKED_OUT = Gauge("beewatch_db_pool_checked_out", "Connections currently checked out", multiprocess_mode="livesum")
+DB_POOL_SATURATION = Gauge("beewatch_db_pool_saturation", "Checked-out connections / pool capacity", multiprocess_mode="max")
+
+def instrument_engine(sync_engine):
+    """Times every statement executed through the engine."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # One value per connection: a statement that raises never reaches _after and is simply overwritten
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_started", None)
+        if started is not None:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started)
+
+class PrometheusMiddleware:
+    """Records request latency per route template (not raw path, to bound label cardinality)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+        streamed = False
+
+        async def send_wrapper(message):
+            nonlocal status, streamed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                streamed = content_type.startswith(STREAMED_MEDIA_TYPES)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = getattr(scope.get("route"), "path", "unmatched")
+            histogram = STREAM_DURATION if streamed or (path in STREAMED_ROUTES and status < 400) else REQUEST_LATENCY
+            histogram.labels(scope["method"], path, str(status)).observe(time.perf_counter() - started)
+
+def render_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
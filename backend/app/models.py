@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 # CHANGED: Updated import to point to backend.app.database
 from backend.app.database import Base
@@ -23,6 +23,9 @@ class Telemetry(Base):
     rssi_dbm = Column(Integer)
     error_flags = Column(Integer, default=0)
 
+    # The (time, node_id) primary key can't serve "latest row for a node"; this can
+    __table_args__ = (Index("ix_telemetry_node_time", node_id, time.desc()),)
+
 class InferenceResult(Base):
     __tablename__ = "inference_results"
     time = Column(DateTime(timezone=True), primary_key=True, nullable=False)
@@ -33,20 +36,32 @@ class InferenceResult(Base):
     anomaly_score = Column(Float)
     raw_outputs = Column(JSONB)
 
+    __table_args__ = (Index("ix_inference_results_node_time", node_id, time.desc()),)
+
 class Command(Base):
     __tablename__ = "commands"
     command_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     node_id = Column(String(64), ForeignKey("nodes.node_id"))
     command_type = Column(String(32))
     params = Column(JSONB)
-    status = Column(String(16), default="pending")
+    status = Column(String(16), default="pending")  # pending -> sent -> acked -> completed/failed, or sent -> expired
+    attempts = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     sent_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
 
+    __table_args__ = (Index("ix_commands_node_status", "node_id", "status", "created_at"),)
+
 class DeviceLog(Base):
     __tablename__ = "device_logs"
+    # Hypertable partitioned on created_at, which therefore has to be part of the primary key
     log_id = Column(Integer, primary_key=True, autoincrement=True)
     node_id = Column(String(64), ForeignKey("nodes.node_id"))
     message = Column(Text)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, default=datetime.utcnow)
+
+    # Covers GET /logs/ (node_id filter, newest first) as a key-ordered index scan.
+    # message (unbounded Text) stays out of the index: btree entries are capped at ~2.7 KB
+    __table_args__ = (
+        Index("ix_device_logs_node_time", node_id, created_at.desc(), postgresql_include=["log_id"]),
+    )
\ No newline at end of file
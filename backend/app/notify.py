@@ -0,0 +1,79 @@
+import os
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Set
+import psycopg
+from backend.app.database import engine
+
+# Cross-worker wakeups ride on PostgreSQL LISTEN/NOTIFY; disable for single-worker setups
+PG_LISTEN_ENABLED = os.getenv("PG_LISTEN_ENABLED", "true").lower() in ("1", "true", "yes")
+
+COMMAND_CHANNEL = "command_queued"
+# Stay well inside PostgreSQL's 8000-byte NOTIFY payload limit
+MAX_NOTIFY_PAYLOAD = 7000
+
+class NodeSignals:
+    """Per-node wakeups for requests parked in a long-poll."""
+
+    def __init__(self):
+        self.waiters: Dict[str, Set[asyncio.Event]] = defaultdict(set)
+
+    @contextmanager
+    def subscribe(self, node_id: str):
+        event = asyncio.Event()
+        self.waiters[node_id].add(event)
+        try:
+            yield event
+        finally:
+            self.waiters[node_id].discard(event)
+            if not self.waiters[node_id]:
+                del self.waiters[node_id]
+
+    def notify(self, node_id: str):
+        for event in self.waiters.get(node_id, ()):
+            event.set()
+
+class PgListener:
+    """Dispatches PostgreSQL NOTIFY payloads to in-process handlers, one connection per worker."""
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[str], None]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def on(self, channel: str, handler: Callable[[str], None]):
+        self.handlers[channel] = handler
+
+    async def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        conninfo = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    for channel in self.handlers:
+                        await conn.execute(f"LISTEN {channel}")
+                    print(f"[NOTIFY] Listening on {', '.join(self.handlers)}")
+                    async for notification in conn.notifies():
+                        handler = self.handlers.get(notification.channel)
+                        if handler:
+                            handler(notification.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[NOTIFY] Listener connection lost ({e}); reconnecting in 5s")
+                await asyncio.sleep(5)
+
+command_signals = NodeSignals()
+pg_listener = PgListener()
+pg_listener.on(COMMAND_CHANNEL, command_signals.notify)
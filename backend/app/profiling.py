@@ -0,0 +1,222 @@
+import os
+import time
+import random
+import asyncio
+import functools
+import itertools
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Deque, Optional
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from backend.app.metrics import STREAMED_MEDIA_TYPES
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:
+    # Optional (pip install happybees[profiling]); phase breakdowns are recorded without it
+    Profiler = None
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))      # fraction of requests, 0 = off
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")                          # X-Profile value that forces a profile
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))        # stack sampling period (seconds)
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))                     # profiles kept per worker
+# Path prefixes never profiled. Streamed responses (SSE, NDJSON, exports) are dropped by media type below
+PROFILE_EXCLUDE = tuple(p for p in os.getenv("PROFILE_EXCLUDE", "/metrics").split(",") if p)
+
+PROFILE_HEADER = b"x-profile"
+
+class RequestProfile:
+    """Wall-clock phase timestamps for one sampled request, plus its stack samples."""
+
+    def __init__(self, profile_id: int, method: str, path: str):
+        self.profile_id = profile_id
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.endpoint_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+        self.response_ready: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.db_seconds = 0.0
+        self.db_statements = 0
+        self.session = None    # pyinstrument session, if the stack profiler ran
+
+    def breakdown(self) -> dict:
+        ms = lambda seconds: round(1000 * seconds, 3)
+        total = self.finished - self.started
+        phases = {"total_ms": ms(total), "db_ms": ms(self.db_seconds), "db_statements": self.db_statements}
+        if None in (self.endpoint_started, self.endpoint_finished, self.response_ready):
+            # Not an API route (404, /health, ...): only the total is meaningful
+            return phases
+        endpoint = self.endpoint_finished - self.endpoint_started
+        phases.update(
+            # Body parsing, parameter validation and dependencies (e.g. get_session)
+            validation_ms=ms(self.endpoint_started - self.started),
+            handler_ms=ms(max(endpoint - self.db_seconds, 0.0)),
+            # Response model validation + JSON encoding
+            serialization_ms=ms(self.response_ready - self.endpoint_finished),
+            send_ms=ms(self.finished - self.response_ready),
+        )
+        return phases
+
+    def summary(self) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "sampled_stacks": self.session is not None,
+            **self.breakdown(),
+        }
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+class ProfileStore:
+    """Recent profiles of this worker, and the single stack-profiler slot."""
+
+    def __init__(self, keep: int):
+        self.ids = itertools.count(1)
+        self.profiles: Deque[RequestProfile] = deque(maxlen=keep)
+        self.profiler_busy = False
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        return next((p for p in self.profiles if p.profile_id == profile_id), None)
+
+profile_store = ProfileStore(PROFILE_KEEP)
+
+def track_queries(sync_engine):
+    """Adds statement execution time to the profile of the request that issued it."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if current_profile.get() is not None:
+            conn.info["profile_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        started = conn.info.pop("profile_started", None)
+        if profile is not None and started is not None:
+            profile.db_seconds += time.perf_counter() - started
+            profile.db_statements += 1
+
+def _mark(attr: str):
+    profile = current_profile.get()
+    if profile is not None:
+        setattr(profile, attr, time.perf_counter())
+
+def _timed_endpoint(endpoint):
+    # functools.wraps keeps the signature FastAPI inspects for parameters and dependencies
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            _mark("endpoint_started")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark("endpoint_finished")
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            _mark("endpoint_started")
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark("endpoint_finished")
+    return wrapper
+
+class ProfiledRoute(APIRoute):
+    """Route class that timestamps the validation / endpoint / serialization phases of sampled requests."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            response = await handler(request)
+            _mark("response_ready")
+            return response
+
+        return profiled_handler
+
+def _should_profile(scope) -> bool:
+    if scope["path"].startswith(PROFILE_EXCLUDE):
+        return False
+    if PROFILE_TOKEN and dict(scope["headers"]).get(PROFILE_HEADER, b"").decode() == PROFILE_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+class ProfilingMiddleware:
+    """
+    Profiles a sample of requests (PROFILE_SAMPLE_RATE) or those sending X-Profile: <PROFILE_TOKEN>.
+
+    Unsampled requests pay one random() call. At most one request per worker
+    runs under the stack profiler at a time; others sampled meanwhile still
+    get their phase breakdown.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(next(profile_store.ids), scope["method"], scope["path"])
+        token = current_profile.set(profile)
+        profiler = None
+        if Profiler is not None and not profile_store.profiler_busy:
+            profile_store.profiler_busy = True
+            profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+            try:
+                profiler.start()
+            except RuntimeError as e:
+                # e.g. another profiler already attached to this thread
+                print(f"[PROFILE] Stack profiler unavailable: {e}")
+                profiler = None
+                profile_store.profiler_busy = False
+
+        def release_profiler():
+            nonlocal profiler
+            if profiler is not None:
+                profile.session = profiler.stop()
+                profile_store.profiler_busy = False
+                profiler = None
+
+        streamed = False
+
+        async def send_wrapper(message):
+            nonlocal streamed
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                if content_type.startswith(STREAMED_MEDIA_TYPES):
+                    # Open-ended body: don't hold the worker's sampler for the whole transfer
+                    streamed = True
+                    release_profiler()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.finished = time.perf_counter()
+            release_profiler()
+            profile.route = getattr(scope.get("route"), "path", None)
+            current_profile.reset(token)
+            if not streamed:
+                profile_store.profiles.append(profile)
+
+def render_profile(profile: RequestProfile, fmt: str) -> str:
+    """speedscope JSON (open at https://www.speedscope.app) or pyinstrument's HTML flamegraph."""
+    renderer = SpeedscopeRenderer() if fmt == "speedscope" else HTMLRenderer()
+    return renderer.render(profile.session)
@@ -0,0 +1,97 @@
+import os
+import time
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import update, values, column, String, DateTime
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from backend.app.database import engine
+from backend.app.models import Node
+
+NODE_REGISTRY_TTL = float(os.getenv("NODE_REGISTRY_TTL", "300"))               # seconds a node stays "known"
+NODE_HEARTBEAT_INTERVAL = float(os.getenv("NODE_HEARTBEAT_INTERVAL", "30"))    # last_seen_at flush period
+
+class NodeRegistry:
+    """
+    In-memory view of registered nodes.
+
+    Unknown nodes are inserted once (then trusted for NODE_REGISTRY_TTL), and
+    last_seen_at heartbeats are coalesced into one batched UPDATE per interval,
+    so ingest no longer touches the `nodes` row on every datapoint.
+    """
+
+    def __init__(self, ttl: float, interval: float):
+        self.ttl = ttl
+        self.interval = interval
+        self.known: Dict[str, float] = {}         # node_id -> monotonic expiry
+        self.pending: Dict[str, datetime] = {}    # node_id -> newest unflushed last_seen_at
+        self.task: Optional[asyncio.Task] = None
+
+    async def ensure(self, node_ids: Iterable[str], seen_at: Optional[datetime] = None):
+        """Registers unknown nodes and queues a heartbeat for all of them."""
+        seen_at = seen_at or datetime.utcnow()
+        now = time.monotonic()
+        missing = []
+        for node_id in set(node_ids):
+            self.pending[node_id] = seen_at
+            if self.known.get(node_id, 0) <= now:
+                missing.append(node_id)
+        if not missing:
+            return
+
+        # Own transaction: the caller's session may still roll back, the registration must not
+        stmt = pg_insert(Node).values([
+            {"node_id": node_id, "name": f"Node {node_id}", "last_seen_at": seen_at}
+            for node_id in sorted(missing)
+        ]).on_conflict_do_nothing(index_elements=[Node.node_id])
+        async with engine.begin() as conn:
+            await conn.execute(stmt)
+
+        expiry = now + self.ttl
+        for node_id in missing:
+            self.known[node_id] = expiry
+
+    def forget(self, node_id: str):
+        self.known.pop(node_id, None)
+
+    async def flush(self):
+        """Writes all pending heartbeats in a single UPDATE ... FROM (VALUES ...)."""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        heartbeats = values(
+            column("node_id", String), column("seen_at", DateTime(timezone=True)), name="hb"
+        ).data(list(batch.items()))
+        stmt = (
+            update(Node)
+            .where(Node.node_id == heartbeats.c.node_id)
+            .values(last_seen_at=heartbeats.c.seen_at)
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(stmt)
+        except Exception as e:
+            print(f"[REGISTRY] Heartbeat flush failed: {e}")
+            # Put them back unless a newer heartbeat arrived meanwhile
+            for node_id, seen_at in batch.items():
+                self.pending.setdefault(node_id, seen_at)
+
+    async def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+node_registry = NodeRegistry(NODE_REGISTRY_TTL, NODE_HEARTBEAT_INTERVAL)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 from uuid import UUID
 
 class TelemetryCreate(BaseModel):
@@ -12,6 +12,26 @@ class TelemetryCreate(BaseModel):
     rssi_dbm: Optional[int] = None
     error_flags: int = 0
 
+class TelemetryRead(BaseModel):
+    time: datetime
+    node_id: str
+    temperature_c: Optional[float] = None
+    humidity_pct: Optional[float] = None
+    battery_mv: Optional[int] = None
+    rssi_dbm: Optional[int] = None
+    error_flags: Optional[int] = None
+
+class BatchRowStatus(BaseModel):
+    index: int
+    status: str  # "accepted", "duplicate" or "rejected"
+    error: Optional[str] = None
+
+class TelemetryBatchResponse(BaseModel):
+    accepted: int
+    duplicates: int     # already stored, or repeated within the batch
+    rejected: int       # failed validation
+    results: List[BatchRowStatus]
+
 class InferenceCreate(BaseModel):
     node_id: str
     timestamp: Optional[datetime] = None
@@ -21,6 +41,15 @@ class InferenceCreate(BaseModel):
     anomaly_score: Optional[float] = None
     raw_outputs: Optional[Dict[str, float]] = None
 
+class InferenceRead(BaseModel):
+    time: datetime
+    node_id: str
+    model_type: Optional[str] = None
+    classification: Optional[str] = None
+    confidence: Optional[float] = None
+    anomaly_score: Optional[float] = None
+    raw_outputs: Optional[Dict[str, float]] = None
+
 class CommandCreate(BaseModel):
     node_id: str
     command_type: str
@@ -29,3 +58,12 @@ class CommandCreate(BaseModel):
 class CommandResponse(BaseModel):
     command_id: UUID
     status: str
+
+class CommandComplete(BaseModel):
+    status: Literal["completed", "failed"] = "completed"
+
+class DeviceLogRead(BaseModel):
+    log_id: int
+    node_id: str
+    message: Optional[str] = None
+    created_at: datetime
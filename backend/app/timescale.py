@@ -0,0 +1,250 @@
+import os
+from datetime import timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import text
+
+def _interval_env(name: str, default: str) -> Optional[str]:
+    """Interval setting; "off" (or empty) disables the corresponding policy."""
+    value = os.getenv(name, default).strip()
+    return None if value.lower() in ("", "off", "none") else value
+
+class HypertablePolicy(NamedTuple):
+    table: str
+    time_column: str
+    chunk_interval: str
+    compress_after: Optional[str]
+    retain_for: Optional[str]
+
+# Storage layout per hypertable (ARCHITECTURE.md section 6.2), overridable per table via env
+HYPERTABLE_POLICIES = [
+    HypertablePolicy(
+        "telemetry", "time",
+        os.getenv("TELEMETRY_CHUNK_INTERVAL", "7 days"),
+        _interval_env("TELEMETRY_COMPRESS_AFTER", "7 days"),
+        _interval_env("TELEMETRY_RETENTION", "1 year"),
+    ),
+    HypertablePolicy(
+        "inference_results", "time",
+        os.getenv("INFERENCE_CHUNK_INTERVAL", "7 days"),
+        _interval_env("INFERENCE_COMPRESS_AFTER", "7 days"),
+        _interval_env("INFERENCE_RETENTION", "1 year"),
+    ),
+    HypertablePolicy(
+        "device_logs", "created_at",
+        os.getenv("LOGS_CHUNK_INTERVAL", "1 day"),
+        _interval_env("LOGS_COMPRESS_AFTER", "3 days"),
+        _interval_env("LOGS_RETENTION", "30 days"),
+    ),
+]
+
+# Telemetry metric name -> source column, aggregated into <metric>_min/_max/_avg/_count
+ROLLUP_METRICS = {
+    "temperature": "temperature_c",
+    "humidity": "humidity_pct",
+    "battery": "battery_mv",
+    "rssi": "rssi_dbm",
+}
+
+class Rollup(NamedTuple):
+    view: str
+    width: timedelta
+    interval: str           # same width, as SQL interval text
+    start_offset: str       # how far back each refresh looks
+    end_offset: str         # leave the still-filling bucket to real-time aggregation
+    schedule: str
+
+# Finest first; the rollup endpoint scans from the end for the coarsest match
+TELEMETRY_ROLLUPS = [
+    Rollup("telemetry_1m", timedelta(minutes=1), "1 minute", "2 hours", "1 minute", "1 minute"),
+    Rollup("telemetry_15m", timedelta(minutes=15), "15 minutes", "1 day", "15 minutes", "15 minutes"),
+    Rollup("telemetry_1h", timedelta(hours=1), "1 hour", "3 days", "1 hour", "1 hour"),
+    Rollup("telemetry_1d", timedelta(days=1), "1 day", "30 days", "1 day", "1 day"),
+]
+
+def _rollup_select(interval: str) -> str:
+    aggregates = []
+    for metric, col in ROLLUP_METRICS.items():
+        aggregates += [
+            f"min({col}) AS {metric}_min",
+            f"max({col}) AS {metric}_max",
+            f"avg({col}) AS {metric}_avg",
+            f"count({col}) AS {metric}_count",
+        ]
+    return (
+        f"SELECT time_bucket(INTERVAL '{interval}', time) AS bucket, node_id, "
+        + ", ".join(aggregates)
+        + ", count(*) AS samples FROM telemetry GROUP BY bucket, node_id"
+    )
+
+async def create_rollups(conn):
+    """Creates the telemetry continuous aggregates and their refresh policies (idempotent)."""
+    for rollup in TELEMETRY_ROLLUPS:
+        # materialized_only = false serves the not-yet-refreshed tail from raw rows
+        await conn.execute(text(
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS {rollup.view} "
+            f"WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS "
+            f"{_rollup_select(rollup.interval)} WITH NO DATA;"
+        ))
+        await conn.execute(text(
+            f"SELECT add_continuous_aggregate_policy('{rollup.view}', "
+            f"start_offset => INTERVAL '{rollup.start_offset}', "
+            f"end_offset => INTERVAL '{rollup.end_offset}', "
+            f"schedule_interval => INTERVAL '{rollup.schedule}', "
+            f"if_not_exists => TRUE);"
+        ))
+
+def pick_rollup(bucket: timedelta):
+    """Coarsest aggregate whose buckets tile the requested bucket exactly."""
+    for rollup in reversed(TELEMETRY_ROLLUPS):
+        if rollup.width <= bucket and bucket % rollup.width == timedelta(0):
+            return rollup
+    return None
+
+def rollup_query(view: str) -> str:
+    """Re-buckets a continuous aggregate to the requested width (count-weighted averages)."""
+    columns = []
+    for metric in ROLLUP_METRICS:
+        columns += [
+            f"min({metric}_min) AS {metric}_min",
+            f"max({metric}_max) AS {metric}_max",
+            f"sum({metric}_avg * {metric}_count) / NULLIF(sum({metric}_count), 0) AS {metric}_avg",
+            f"sum({metric}_count) AS {metric}_count",
+        ]
+    return (
+        "SELECT time_bucket(:width, bucket) AS time, " + ", ".join(columns)
+        + f", sum(samples) AS samples FROM {view} "
+        "WHERE node_id = :node_id AND bucket >= :start AND bucket < :end "
+        "GROUP BY 1 ORDER BY 1"
+    )
+
+async def _sync_policy(conn, table: str, proc_name: str, config_key: str, interval: Optional[str], add_sql: str, remove_sql: str):
+    """Adds, replaces or removes a policy job so it matches `interval`."""
+    job = (await conn.execute(text(
+        f"SELECT job_id, CAST(config->>'{config_key}' AS interval) = CAST(:interval AS interval) AS current "
+        "FROM timescaledb_information.jobs WHERE proc_name = :proc AND hypertable_name = :table"
+    ), {"interval": interval or "0", "proc": proc_name, "table": table})).first()
+
+    if job is not None and interval is not None and job.current:
+        return
+    if job is not None:
+        await conn.execute(text(remove_sql.format(table=table)))
+    if interval is not None:
+        await conn.execute(text(add_sql.format(table=table)), {"interval": interval})
+        print(f"[DB] {table}: {proc_name} set to {interval}")
+
+async def _ensure_time_in_primary_key(conn, table: str, time_column: str):
+    """Hypertables need the partitioning column in every unique index; widens legacy primary keys."""
+    if (await conn.execute(text(
+        "SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = :table"
+    ), {"table": table})).first():
+        return
+
+    pk = (await conn.execute(text(
+        "SELECT c.conname, array_agg(a.attname::text ORDER BY a.attnum) AS columns "
+        "FROM pg_constraint c JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey) "
+        "WHERE c.conrelid = CAST(:table AS regclass) AND c.contype = 'p' GROUP BY c.conname"
+    ), {"table": table})).first()
+    if pk is None or time_column in pk.columns:
+        return
+
+    print(f"[DB] {table}: adding {time_column} to primary key before hypertable conversion")
+    await conn.execute(text(f"UPDATE {table} SET {time_column} = now() WHERE {time_column} IS NULL;"))
+    await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {time_column} SET NOT NULL;"))
+    await conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{pk.conname}";'))
+    await conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(pk.columns + [time_column])});"))
+
+async def apply_policies(conn):
+    """
+    Idempotently applies chunk sizing, compression and retention to every hypertable.
+
+    Safe to run on each startup: unchanged settings are left alone, changed
+    intervals replace the existing policy job, and errors propagate.
+    """
+    for policy in HYPERTABLE_POLICIES:
+        table = policy.table
+        await _ensure_time_in_primary_key(conn, table, policy.time_column)
+        await conn.execute(text(
+            f"SELECT create_hypertable('{table}', '{policy.time_column}', "
+            f"chunk_time_interval => CAST(:chunk AS interval), if_not_exists => TRUE, migrate_data => TRUE);"
+        ), {"chunk": policy.chunk_interval})
+        # Only affects chunks created from now on
+        await conn.execute(text(
+            f"SELECT set_chunk_time_interval('{table}', CAST(:chunk AS interval));"
+        ), {"chunk": policy.chunk_interval})
+
+        if policy.compress_after is not None:
+            enabled = (await conn.execute(text(
+                "SELECT compression_enabled FROM timescaledb_information.hypertables WHERE hypertable_name = :table"
+            ), {"table": table})).scalar()
+            if not enabled:
+                await conn.execute(text(
+                    f"ALTER TABLE {table} SET (timescaledb.compress, "
+                    f"timescaledb.compress_segmentby = 'node_id', "
+                    f"timescaledb.compress_orderby = '{policy.time_column} DESC');"
+                ))
+        await _sync_policy(
+            conn, table, "policy_compression", "compress_after", policy.compress_after,
+            "SELECT add_compression_policy('{table}', CAST(:interval AS interval));",
+            "SELECT remove_compression_policy('{table}', if_exists => TRUE);",
+        )
+        await _sync_policy(
+            conn, table, "policy_retention", "drop_after", policy.retain_for,
+            "SELECT add_retention_policy('{table}', CAST(:interval AS interval));",
+            "SELECT remove_retention_policy('{table}', if_exists => TRUE);",
+        )
+
+async def storage_stats(session):
+    """Chunk, size, compression and policy-job figures for each managed hypertable."""
+    stats = []
+    for policy in HYPERTABLE_POLICIES:
+        table = policy.table
+        info = (await session.execute(text(
+            "SELECT h.num_chunks, h.compression_enabled, d.time_interval AS chunk_interval "
+            "FROM timescaledb_information.hypertables h "
+            "JOIN timescaledb_information.dimensions d ON d.hypertable_name = h.hypertable_name "
+            "WHERE h.hypertable_name = :table AND d.dimension_number = 1"
+        ), {"table": table})).mappings().first()
+        if info is None:
+            stats.append({"table": table, "hypertable": False})
+            continue
+
+        size = (await session.execute(text(
+            f"SELECT table_bytes, index_bytes, toast_bytes, total_bytes FROM hypertable_detailed_size('{table}')"
+        ))).mappings().first()
+        chunks = (await session.execute(text(
+            "SELECT count(*) FILTER (WHERE is_compressed) AS compressed_chunks, "
+            "min(range_start) AS oldest_chunk, max(range_end) AS newest_chunk "
+            "FROM timescaledb_information.chunks WHERE hypertable_name = :table"
+        ), {"table": table})).mappings().first()
+        compression = None
+        if info["compression_enabled"]:
+            compression = (await session.execute(text(
+                "SELECT before_compression_total_bytes, after_compression_total_bytes "
+                f"FROM hypertable_compression_stats('{table}')"
+            ))).mappings().first()
+        jobs = (await session.execute(text(
+            "SELECT j.job_id, j.proc_name, j.schedule_interval, j.config, s.last_run_status, s.next_start "
+            "FROM timescaledb_information.jobs j "
+            "LEFT JOIN timescaledb_information.job_stats s ON s.job_id = j.job_id "
+            "WHERE j.hypertable_name = :table ORDER BY j.job_id"
+        ), {"table": table})).mappings().all()
+
+        stats.append({
+            "table": table,
+            "hypertable": True,
+            "chunk_interval": info["chunk_interval"],
+            "chunks": info["num_chunks"],
+            "compressed_chunks": chunks["compressed_chunks"],
+            "oldest_chunk": chunks["oldest_chunk"],
+            "newest_chunk": chunks["newest_chunk"],
+            "compression_enabled": info["compression_enabled"],
+            "size": dict(size) if size else None,
+            "compression": dict(compression) if compression else None,
+            "policies": {
+                "compress_after": policy.compress_after,
+                "retain_for": policy.retain_for,
+            },
+            "jobs": [dict(job) for job in jobs],
+        })
+    return stats
+
@@ -0,0 +1,91 @@
+// Clientside renderers for the node view: the Flask callbacks only ship compact
+// column arrays (telemetry-store) and [time, message] pairs (logs-store).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    beewatch: {
+        renderChart: function (data) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!data) {
+                return [noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+            if (data.error) {
+                // Placeholders on a tab that never drew; otherwise keep what is on screen
+                return data.reset ? ["--", "--", emptyFigure(), noUpdate] : [noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+
+            const n = data.time.length;
+            const temp = data.temperature_c[n - 1];
+            const hum = data.humidity_pct[n - 1];
+            const tempTxt = temp == null ? "--" : temp.toFixed(1);
+            const humTxt = hum == null ? "--" : hum.toFixed(1);
+
+            if (data.reset) {
+                return [tempTxt, humTxt, chartFigure(data), noUpdate];
+            }
+            // Append only; the ring holds the window plus every point appended before the next redraw
+            const extend = [
+                {x: [data.time, data.time], y: [data.temperature_c, data.humidity_pct]},
+                [0, 1],
+                data.max_points
+            ];
+            return [tempTxt, humTxt, noUpdate, extend];
+        },
+
+        renderTerminal: function (logs) {
+            if (!logs) {
+                return window.dash_clientside.no_update;
+            }
+            if (logs.error) {
+                return {type: "Div", namespace: "dash_html_components", props: {children: "CONNECTION_LOST...", className: "text-danger"}};
+            }
+            return logs.map(function (entry) {
+                return {
+                    type: "Div",
+                    namespace: "dash_html_components",
+                    props: {
+                        className: "log-entry",
+                        children: [
+                            {type: "Span", namespace: "dash_html_components", props: {children: "[" + entry[0] + "] ", className: "log-timestamp"}},
+                            {type: "Span", namespace: "dash_html_components", props: {children: entry[1]}}
+                        ]
+                    }
+                };
+            });
+        }
+    }
+});
+
+function emptyFigure() {
+    return {
+        data: [],
+        layout: {
+            paper_bgcolor: "rgba(0,0,0,0)",
+            plot_bgcolor: "rgba(0,0,0,0)",
+            xaxis: {showgrid: false, showticklabels: false},
+            yaxis: {showgrid: false, showticklabels: false}
+        }
+    };
+}
+
+function chartFigure(data) {
+    return {
+        data: [
+            // Temperature Line
+            {type: "scatter", mode: "lines", name: "TEMP", x: data.time, y: data.temperature_c,
+             line: {color: "#FFD700", width: 2}},
+            // Humidity Line (Secondary Axis)
+            {type: "scatter", name: "HUM", x: data.time, y: data.humidity_pct, yaxis: "y2",
+             line: {color: "#FFFFFF", width: 1, dash: "dot"}}
+        ],
+        layout: {
+            paper_bgcolor: "rgba(0,0,0,0)",
+            plot_bgcolor: "rgba(0,0,0,0)",
+            font: {color: "#FFD700", family: "Exo"},
+            margin: {l: 50, r: 50, t: 20, b: 40},
+            yaxis: {title: {text: "Temp (C)"}, gridcolor: "rgba(255,255,255,0.1)", showgrid: true},
+            yaxis2: {title: {text: "Hum (%)"}, overlaying: "y", side: "right", showgrid: false},
+            xaxis: {gridcolor: "rgba(255,255,255,0.1)", showgrid: true},
+            legend: {orientation: "h", y: 1.1, x: 0},
+            hovermode: "x unified"
+        }
+    };
+}
@@ -2,24 +2,51 @@ import os
 import sys
 import logging
 import argparse
-from dash import Dash, html, dcc, Output, Input, State, callback_context
+from dash import Dash, html, dcc, dash_table, Output, Input, State, ClientsideFunction, callback_context, no_update
 import dash_bootstrap_components as dbc
-import plotly.graph_objs as go
-import httpx
-import pandas as pd
+from backend.dashboard.client import ApiClient
+from backend.dashboard.cache import SharedCache
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote, unquote
 from flask import request
 
 # --- 1. CLI ARGUMENT PARSING ---
 # We use parse_known_args because Dash/Flask might try to interpret other args
 parser = argparse.ArgumentParser(description="BeeWatch Dashboard")
-parser.add_argument("--node", default="pico-hive-001", help="Target Node ID (default: pico-hive-001)")
+parser.add_argument("--node", default=None, help="Open this node at / instead of the fleet overview (fleet stays at /fleet)")
 parser.add_argument("--api", default="http://localhost:8000/api/v1", help="API URL (default: http://localhost:8000/api/v1)")
+parser.add_argument("--hours", type=float, default=24, help="Chart window in hours (default: 24)")
+parser.add_argument("--max-points", type=int, default=1500, help="Points per chart; the API downsamples to this (default: 1500)")
+parser.add_argument("--consolidated", action="store_true", help="Fetch new chart points and logs in one snapshot call per refresh")
+parser.add_argument("--cache-ttl", type=float, default=1.0, help="Seconds API responses are shared between viewers (default: 1.0)")
+parser.add_argument("--stale-after", type=float, default=300, help="Seconds without contact before the fleet view flags a node STALE (default: 300)")
 args, unknown = parser.parse_known_args()
 
-NODE_ID = args.node
+DEFAULT_NODE = args.node
 API_URL = args.api
+WINDOW = timedelta(hours=args.hours)
+MAX_POINTS = args.max_points
+CONSOLIDATED = args.consolidated
+STALE_AFTER = args.stale_after
 
-print(f"\n[INIT] Dashboard targeting Node: {NODE_ID}")
+FLEET_PATH = "/fleet"
+NODE_PATH = "/node/"
+
+# Newest raw rows polled for incremental chart updates (covers 200 s at the mock's 2 s cadence)
+RECENT_ROWS = 100
+# Raw points appended before the window is redrawn (5 min at 2 s): keeps the chart spanning --hours
+REDRAW_AFTER = 150
+# Room for the downsampled window plus everything appended until the next redraw
+CHART_RING = MAX_POINTS + RECENT_ROWS + REDRAW_AFTER
+# Only the plotted series: the API spends the whole --max-points budget on them
+CHART_FIELDS = "time,temperature_c,humidity_pct"
+
+# Shared keep-alive connection pool for all callbacks
+api = ApiClient(API_URL)
+# Every tab reads the same cached responses; one background refresher per node hits the API
+cache = SharedCache(ttl=args.cache_ttl)
+
+print(f"\n[INIT] Dashboard landing page: {f'{NODE_PATH}{DEFAULT_NODE}' if DEFAULT_NODE else FLEET_PATH}")
 print(f"[INIT] API Endpoint: {API_URL}\n")
 
 # --- 2. RIGOROUS PATH VALIDATION ---
@@ -54,7 +81,9 @@ app = Dash(
     __name__, 
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     assets_folder=ASSETS_PATH,
-    title=f"BEEWATCH: {NODE_ID}"
+    title="BEEWATCH",
+    # Page components are swapped in by the router below
+    suppress_callback_exceptions=True
 )
 
 # Hook into the underlying Flask server to log asset requests
@@ -71,14 +100,16 @@ def log_response_info(response):
 
 # --- HELPER COMPONENTS ---
 
-def make_header():
+def make_header(target, back=False):
     return dbc.Row([
         # FIX: Logo 30% bigger (110px), No Glow Filter
         dbc.Col(html.Img(src=app.get_asset_url("beewatch_logo.png"), style={"height": "110px"}), width="auto"),
         dbc.Col([
             html.H1("BEEWATCH SYSTEMS", className="retro-glow m-0"),
-            html.Div(f"TARGET: {NODE_ID} // STATUS: MONITORING", className="small text-white", style={"letterSpacing": "2px", "opacity": "0.8"})
-        ], className="d-flex flex-column justify-content-center ps-4")
+            html.Div(f"TARGET: {target} // STATUS: MONITORING", className="small text-white", style={"letterSpacing": "2px", "opacity": "0.8"})
+        ], className="d-flex flex-column justify-content-center ps-4"),
+        dbc.Col(dcc.Link("<< FLEET_OVERVIEW", href=FLEET_PATH, className="retro-btn px-3 py-2 text-decoration-none"),
+                width="auto", className="d-flex align-items-center") if back else None,
     ], className="mb-4 border-bottom border-warning pb-3")
 
 def div_card(title, content, height=None):
@@ -118,10 +149,52 @@ def make_controls():
 
 # --- LAYOUT ---
 
-app.layout = html.Div([
-    dbc.Container([
-        make_header(),
-        
+FLEET_COLUMNS = [
+    {"name": "NODE", "id": "node_id"},
+    {"name": "NAME", "id": "name"},
+    {"name": "TEMP (C)", "id": "temperature_c", "type": "numeric"},
+    {"name": "HUM (%)", "id": "humidity_pct", "type": "numeric"},
+    {"name": "BATT (mV)", "id": "battery_mv", "type": "numeric"},
+    {"name": "LAST INFERENCE", "id": "inference"},
+    {"name": "LAST SEEN (UTC)", "id": "last_seen"},
+    {"name": "STALENESS (S)", "id": "staleness_s", "type": "numeric"},
+    {"name": "STATUS", "id": "status"},
+]
+
+def fleet_layout():
+    return [
+        make_header("FLEET"),
+        div_card("FLEET_OVERVIEW", [
+            # Virtualized: the browser only renders the rows in view, so 1,000+ nodes stay smooth
+            dash_table.DataTable(
+                id="fleet-table",
+                columns=FLEET_COLUMNS,
+                data=[],
+                virtualization=True,
+                fixed_rows={"headers": True},
+                page_action="none",
+                sort_action="native",
+                filter_action="native",
+                style_table={"height": "600px", "overflowY": "auto"},
+                style_cell={"backgroundColor": "#000", "color": "#fff", "border": "1px solid #1a1a1a",
+                            "fontFamily": "'Courier New', monospace", "minWidth": "110px", "textAlign": "left", "cursor": "pointer"},
+                style_header={"backgroundColor": "#b39700", "color": "#000", "fontWeight": "bold"},
+                style_filter={"backgroundColor": "#0a0a0a", "color": "#FFD700"},
+                style_data_conditional=[
+                    {"if": {"filter_query": '{status} = "STALE"'}, "color": "#FFD700"},
+                    {"if": {"filter_query": '{status} = "OFFLINE" || {status} = "INACTIVE"'}, "color": "#ff5555"},
+                ],
+            ),
+            html.Div(id="fleet-status", className="text-center small text-white mt-3 fst-italic", children="STATUS: LOADING..."),
+        ]),
+        dcc.Interval(id="fleet-updater", interval=5000), # 5s poll for the fleet
+    ]
+
+def node_layout(node_id):
+    return [
+        make_header(node_id, back=True),
+        dcc.Store(id="node-id", data=node_id),
+
         # Row 1: Metrics & Controls
         dbc.Row([
             dbc.Col(make_stat_display("TEMPERATURE", "val-temp", "CELSIUS"), width=3),
@@ -145,106 +218,214 @@ app.layout = html.Div([
         ]),
 
         dcc.Interval(id="data-updater", interval=2000), # 2s poll for data
-        
-        # Hidden div to test CSS loading logic
-        html.Div(id="css-validator", className="retro-glow", style={"display": "none"})
-    ], className="retro-container")
+        dcc.Store(id="chart-cursor"), # newest point time and raw points appended since the last redraw
+        dcc.Store(id="telemetry-store"), # new chart points as column arrays
+        dcc.Store(id="logs-cursor"), # newest log_id rendered in this tab
+        dcc.Store(id="logs-store"), # [time, message] pairs for the terminal
+    ]
+
+app.layout = html.Div([
+    # refresh=False: drill-down and back navigation swap the page without reloading
+    dcc.Location(id="url", refresh=False),
+    dbc.Container(id="page", className="retro-container"),
+
+    # Hidden div to test CSS loading logic
+    html.Div(id="css-validator", className="retro-glow", style={"display": "none"})
 ])
 
 # --- CALLBACKS ---
 
-# 1. Update Metrics & Chart
+def telemetry_window():
+    return {"start": (datetime.now(timezone.utc) - WINDOW).isoformat(), "max_points": MAX_POINTS}
+
+def fetch_window(node_id):
+    return cache.get(
+        (node_id, "telemetry", args.hours, MAX_POINTS),
+        lambda: api.get("/telemetry/", node_id=node_id, fields=CHART_FIELDS, **telemetry_window()),
+        # Read once on a tab's first draw: share it, but don't keep re-running the downsample
+        refresh=False
+    )
+
+def fetch_snapshot(node_id):
+    return cache.get(
+        (node_id, "snapshot", RECENT_ROWS),
+        lambda: api.get(f"/nodes/{quote(node_id, safe='')}/snapshot", limit=RECENT_ROWS, log_limit=50)
+    )
+
+def fetch_recent(node_id):
+    """Newest raw rows, shared by every tab; each tab keeps only those past its own cursor."""
+    if CONSOLIDATED:
+        return fetch_snapshot(node_id)["telemetry"]
+    return cache.get(
+        (node_id, "recent", RECENT_ROWS),
+        lambda: api.get("/telemetry/", node_id=node_id, fields=CHART_FIELDS, limit=RECENT_ROWS)
+    )
+
+def fetch_fleet():
+    # One bulk latest-values query for every node, shared by all fleet tabs
+    return cache.get(("fleet", "latest"), lambda: api.get("/nodes/latest"))
+
+def parse_time(value):
+    t = datetime.fromisoformat(value)
+    return t if t.tzinfo else t.replace(tzinfo=timezone.utc)
+
+def fleet_row(node, now):
+    telemetry = node["telemetry"] or {}
+    inference = node["inference"] or {}
+    seen = node["last_seen_at"] or telemetry.get("time")
+    age = (now - parse_time(seen)).total_seconds() if seen else None
+
+    if not node["is_active"]:
+        status = "INACTIVE"
+    elif age is None:
+        status = "OFFLINE"
+    else:
+        status = "STALE" if age > STALE_AFTER else "LIVE"
+
+    label = inference.get("classification")
+    if label and inference.get("confidence") is not None:
+        label = f"{label} ({inference['confidence']:.0%})"
+    return {
+        "id": node["node_id"], # DataTable row_id, used for drill-down
+        "node_id": node["node_id"],
+        "name": node["name"],
+        "temperature_c": None if telemetry.get("temperature_c") is None else round(telemetry["temperature_c"], 1),
+        "humidity_pct": None if telemetry.get("humidity_pct") is None else round(telemetry["humidity_pct"], 1),
+        "battery_mv": telemetry.get("battery_mv"),
+        "inference": label,
+        "last_seen": parse_time(seen).strftime("%Y-%m-%d %H:%M:%S") if seen else None,
+        "staleness_s": None if age is None else int(age),
+        "status": status,
+    }
+
+def node_from_path(pathname):
+    if pathname in (None, "", "/"):
+        return DEFAULT_NODE
+    if pathname.startswith(NODE_PATH):
+        return unquote(pathname[len(NODE_PATH):]) or None
+    return None
+
+# 0. Routing: / (or /fleet) is the fleet overview, /node/<id> the node view
 @app.callback(
-    [Output("val-temp", "children"), 
-     Output("val-hum", "children"),
-     Output("live-chart", "figure")],
-    [Input("data-updater", "n_intervals")]
+    Output("page", "children"),
+    [Input("url", "pathname")]
 )
-def update_data(_):
+def render_page(pathname):
+    node_id = node_from_path(pathname)
+    return node_layout(node_id) if node_id else fleet_layout()
+
+@app.callback(
+    [Output("fleet-table", "data"),
+     Output("fleet-status", "children")],
+    [Input("fleet-updater", "n_intervals")]
+)
+def update_fleet(_):
     try:
-        r = httpx.get(f"{API_URL}/telemetry/?node_id={NODE_ID}&limit=100")
-        if r.status_code != 200: raise Exception("API Error")
-        data = r.json()
-        if not data: raise Exception("No Data")
-        
-        # Stats
-        latest = data[0]
-        temp_txt = f"{latest['temperature_c']:.1f}"
-        hum_txt = f"{latest['humidity_pct']:.1f}"
-        
-        # Plot
-        df = pd.DataFrame(data)
-        
-        fig = go.Figure()
-        
-        # Temperature Line
-        fig.add_trace(go.Scatter(
-            x=df['time'], y=df['temperature_c'], 
-            name='TEMP', 
-            line=dict(color='#FFD700', width=2), 
-            mode='lines'
-        ))
-        
-        # Humidity Line (Secondary Axis)
-        fig.add_trace(go.Scatter(
-            x=df['time'], y=df['humidity_pct'], 
-            name='HUM', 
-            line=dict(color='#FFFFFF', width=1, dash='dot'), 
-            yaxis='y2'
-        ))
-        
-        fig.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#FFD700', family="Exo"),
-            margin=dict(l=50, r=50, t=20, b=40),
-            yaxis=dict(title="Temp (C)", gridcolor='rgba(255,255,255,0.1)', showgrid=True),
-            yaxis2=dict(title="Hum (%)", overlaying='y', side='right', showgrid=False),
-            xaxis=dict(gridcolor='rgba(255,255,255,0.1)', showgrid=True),
-            legend=dict(orientation="h", y=1.1, x=0),
-            hovermode="x unified"
-        )
-        
-        return temp_txt, hum_txt, fig
+        nodes = fetch_fleet()
+    except Exception:
+        return no_update, "STATUS: CONNECTION_LOST..."
+    now = datetime.now(timezone.utc)
+    rows = [fleet_row(node, now) for node in nodes]
+    stale = sum(row["status"] != "LIVE" for row in rows)
+    return rows, f"STATUS: {len(rows)} NODES // {stale} NOT LIVE // CLICK A ROW TO OPEN"
+
+@app.callback(
+    Output("url", "pathname"),
+    [Input("fleet-table", "active_cell")],
+    prevent_initial_call=True
+)
+def open_node(cell):
+    # row_id survives native sorting and filtering, unlike the row index
+    if not cell or cell.get("row_id") is None:
+        return no_update
+    return NODE_PATH + quote(cell["row_id"], safe="")
+
+def columns(rows, max_points, reset):
+    # Compact column arrays; rendering happens in assets/dashboard.js
+    return {
+        "reset": reset,
+        "max_points": max_points,
+        "time": [row["time"] for row in rows],
+        "temperature_c": [row["temperature_c"] for row in rows],
+        "humidity_pct": [row["humidity_pct"] for row in rows],
+    }
+
+# 1. Chart data: full window once, then only points past this tab's cursor
+@app.callback(
+    [Output("telemetry-store", "data"),
+     Output("chart-cursor", "data")],
+    [Input("data-updater", "n_intervals")],
+    [State("chart-cursor", "data"),
+     State("node-id", "data")]
+)
+def update_data(_, cursor, node_id):
+    try:
+        recent = fetch_recent(node_id)
+        if not recent: raise Exception("No Data")
+
+        if (cursor is None or parse_time(recent[0]["time"]) > parse_time(cursor["time"])
+                or cursor["appended"] >= REDRAW_AFTER):
+            # First draw, this tab fell further behind than the shared recent rows, or the
+            # appended raw points are due to be folded back into a fresh downsampled window
+            data = fetch_window(node_id) or recent
+            if parse_time(recent[-1]["time"]) > parse_time(data[-1]["time"]):
+                data = data + [row for row in recent if parse_time(row["time"]) > parse_time(data[-1]["time"])]
+            return columns(data, CHART_RING, reset=True), {"time": data[-1]["time"], "appended": 0}
+
+        last = parse_time(cursor["time"])
+        new = [row for row in recent if parse_time(row["time"]) > last]
+        if not new:
+            return no_update, no_update
+        return columns(new, CHART_RING, reset=False), {"time": new[-1]["time"], "appended": cursor["appended"] + len(new)}
 
     except Exception:
-        # Return placeholders on error
-        empty_fig = go.Figure()
-        empty_fig.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(showgrid=False, showticklabels=False),
-            yaxis=dict(showgrid=False, showticklabels=False)
-        )
-        return "--", "--", empty_fig
-
-# 2. Update Terminal Log
+        return {"error": True, "reset": cursor is None}, no_update
+
+# 2. Terminal data: [time, message] pairs, only when a new log arrived
 @app.callback(
-    Output("terminal-output", "children"),
-    [Input("term-updater", "n_intervals")]
+    [Output("logs-store", "data"),
+     Output("logs-cursor", "data")],
+    [Input("term-updater", "n_intervals")],
+    [State("logs-cursor", "data"),
+     State("node-id", "data")]
 )
-def update_terminal(_):
+def update_terminal(_, cursor, node_id):
     try:
-        r = httpx.get(f"{API_URL}/logs/?node_id={NODE_ID}&limit=50")
-        if r.status_code != 200: return []
-        logs = r.json()
-        
-        return [
-            html.Div([
-                html.Span(f"[{log['created_at'][11:19]}] ", className="log-timestamp"),
-                html.Span(log['message'])
-            ], className="log-entry") for log in logs
-        ]
-    except:
-        return html.Div("CONNECTION_LOST...", className="text-danger")
+        if CONSOLIDATED:
+            logs = fetch_snapshot(node_id)["logs"]
+        else:
+            logs = cache.get((node_id, "logs", 50), lambda: api.get("/logs/", node_id=node_id, limit=50))
+    except Exception:
+        return {"error": True}, None
+    newest = logs[-1]["log_id"] if logs else 0
+    if newest == cursor:
+        return no_update, no_update
+    return [[log["created_at"][11:19], log["message"]] for log in logs], newest
+
+app.clientside_callback(
+    ClientsideFunction(namespace="beewatch", function_name="renderChart"),
+    [Output("val-temp", "children"),
+     Output("val-hum", "children"),
+     Output("live-chart", "figure"),
+     Output("live-chart", "extendData")],
+    [Input("telemetry-store", "data")]
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="beewatch", function_name="renderTerminal"),
+    Output("terminal-output", "children"),
+    [Input("logs-store", "data")]
+)
 
 # 3. Handle Buttons
 @app.callback(
     Output("cmd-status", "children"),
     [Input(f"btn-{k}", "n_clicks") for k in ['s','w','t','a','m','c','d','p']],
+    [State("node-id", "data")],
     prevent_initial_call=True
 )
 def handle_commands(*args):
+    node_id = args[-1]
     ctx = callback_context
     if not ctx.triggered: return "STATUS: READY"
     
@@ -270,8 +451,8 @@ def handle_commands(*args):
     if button_id == "w": params = {"model": "winter"}
         
     try:
-        httpx.post(f"{API_URL}/commands/", json={
-            "node_id": NODE_ID, 
+        api.post("/commands/", {
+            "node_id": node_id, 
             "command_type": cmd_type,
             "params": params
         })
@@ -0,0 +1,86 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# Keys are (node_id, query, *window), or ("fleet", query): one refresher thread per key[0] keeps them warm
+Key = Tuple[Hashable, ...]
+
+class SharedCache:
+    """
+    Short-TTL cache shared by every browser session of this dashboard process.
+
+    Concurrent misses on a key wait for a single fetch (single-flight), and a
+    background refresher per node re-fetches the keys viewers are still
+    reading, so N open tabs cost the API one request per key per TTL.
+    Keys read once per tab (refresh=False) are shared but never re-fetched.
+    """
+
+    def __init__(self, ttl: float, idle_after: float = 30.0):
+        self.ttl = ttl
+        self.idle_after = idle_after                        # stop refreshing keys nobody read for this long
+        self.values: Dict[Key, Tuple[float, Any]] = {}      # key -> (expires_at, value)
+        self.fetchers: Dict[Key, Callable[[], Any]] = {}
+        self.last_read: Dict[Key, float] = {}
+        self.key_locks: Dict[Key, threading.Lock] = {}
+        self.refreshers: Dict[Hashable, threading.Thread] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: Key, fetch: Callable[[], Any], refresh: bool = True):
+        now = time.monotonic()
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+            if refresh:
+                self.fetchers[key] = fetch
+                self.last_read[key] = now
+                self._ensure_refresher(key[0])
+
+        cached = self.values.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        with key_lock:
+            # Another thread may have fetched it while we waited
+            cached = self.values.get(key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            return self._fetch(key, fetch)
+
+    def _fetch(self, key: Key, fetch: Callable[[], Any]):
+        value = fetch()   # errors propagate and are not cached
+        self.values[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def _ensure_refresher(self, node_id: Hashable):
+        # Caller holds self.lock
+        thread = self.refreshers.get(node_id)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=self._refresh_node, args=(node_id,), name=f"cache-{node_id}", daemon=True)
+            self.refreshers[node_id] = thread
+            thread.start()
+
+    def _refresh_node(self, node_id: Hashable):
+        while True:
+            time.sleep(self.ttl)
+            now = time.monotonic()
+            with self.lock:
+                for key in [k for k in self.fetchers if k[0] == node_id and now - self.last_read[k] > self.idle_after]:
+                    # Nobody is watching any more
+                    del self.fetchers[key], self.last_read[key], self.key_locks[key]
+                    self.values.pop(key, None)
+                for key in [k for k, (expires, _) in list(self.values.items())
+                            if k[0] == node_id and k not in self.fetchers and expires < now]:
+                    # Expired one-shot entry
+                    self.values.pop(key, None)
+                    self.key_locks.pop(key, None)
+                keys = [(k, self.fetchers[k], self.key_locks[k]) for k in self.fetchers if k[0] == node_id]
+                if not keys:
+                    del self.refreshers[node_id]
+                    return
+            for key, fetch, key_lock in keys:
+                # Skip keys a reader is already fetching
+                if key_lock.acquire(blocking=False):
+                    try:
+                        self._fetch(key, fetch)
+                    except Exception as e:
+                        print(f"[CACHE] Refresh of {key} failed: {e}")
+                    finally:
+                        key_lock.release()
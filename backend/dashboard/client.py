@@ -0,0 +1,36 @@
+import httpx
+
+# One pooled client per dashboard process, shared by every callback thread (httpx.Client is thread-safe)
+TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+GET_ATTEMPTS = 2
+
+class ApiClient:
+    """Keep-alive HTTP client for the backend API with timeouts and retries."""
+
+    def __init__(self, base_url: str):
+        self.http = httpx.Client(
+            base_url=base_url.rstrip("/") + "/",
+            timeout=TIMEOUT,
+            # Retries failed connection attempts only; safe for POSTs too
+            transport=httpx.HTTPTransport(retries=2, limits=LIMITS),
+        )
+
+    def get(self, path: str, **params):
+        """GETs are idempotent, so a request dropped on a stale keep-alive connection is retried once."""
+        for attempt in range(GET_ATTEMPTS):
+            try:
+                r = self.http.get(path.lstrip("/"), params=params)
+                r.raise_for_status()
+                return r.json()
+            except httpx.TransportError:
+                if attempt == GET_ATTEMPTS - 1:
+                    raise
+
+    def post(self, path: str, payload: dict):
+        r = self.http.post(path.lstrip("/"), json=payload)
+        r.raise_for_status()
+        return r.json()
+
+    def close(self):
+        self.http.close()
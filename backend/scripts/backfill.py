@@ -0,0 +1,42 @@
+import asyncio
+import argparse
+import sys
+from backend.app.database import init_db
+from backend.app.backfill import CsvRowParser, BackfillError, copy_rows
+
+TABLES = {"telemetry": "telemetry", "inference": "inference_results"}
+CHUNK_LINES = 10000
+
+async def file_batches(path, parser):
+    with open(path, newline="") as f:
+        lines = []
+        for line in f:
+            lines.append(line)
+            if len(lines) >= CHUNK_LINES:
+                yield parser.parse(lines)
+                lines = []
+        if lines:
+            yield parser.parse(lines)
+
+async def main(args):
+    await init_db()
+    table = TABLES[args.kind]
+    for path in args.files:
+        parser = CsvRowParser(table, default_node_id=args.node)
+        stats = await copy_rows(table, file_batches(path, parser))
+        print(f"[BACKFILL] {path}: {stats['rows']} rows -> {stats['inserted']} inserted, "
+              f"{stats['duplicates']} duplicates, {stats['nodes']} nodes "
+              f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load historical CSV data via PostgreSQL COPY")
+    parser.add_argument("kind", choices=TABLES.keys(), help="Target data set")
+    parser.add_argument("files", nargs="+", help="CSV files with a header row (e.g. D1_sensor_data.csv)")
+    parser.add_argument("--node", default=None, help="Node ID for files without a node_id/tag_number column")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except BackfillError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
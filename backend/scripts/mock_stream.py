@@ -7,16 +7,18 @@ import sys
 from datetime import datetime
 
 class MockDevice:
-    def __init__(self, node_id, api_url):
+    def __init__(self, node_id, api_url, wait=25):
         self.node_id = node_id
         self.api_url = api_url
+        self.wait = wait
         self.client = httpx.AsyncClient(timeout=5.0)
         self.mock_mode = False
         self.temp = 25.0
         self.hum = 50.0
         print(f"\n[INIT] Starting Mock Device")
         print(f"       ID:  {self.node_id}")
-        print(f"       API: {self.api_url}\n")
+        print(f"       API: {self.api_url}")
+        print(f"       Long-poll: {self.wait}s\n")
 
     async def log(self, message):
         """Send a log line to the backend to appear in the terminal"""
@@ -53,12 +55,28 @@ class MockDevice:
 
     async def poll_commands(self):
         try:
-            r = await self.client.get(f"{self.api_url}/commands/pending", params={"node_id": self.node_id})
+            # The server parks the request for up to `wait` seconds, so allow for that in the timeout
+            r = await self.client.get(
+                f"{self.api_url}/commands/pending",
+                params={"node_id": self.node_id, "wait": self.wait},
+                timeout=self.wait + 5.0
+            )
             if r.status_code == 200:
                 for cmd in r.json():
+                    await self.ack_command(cmd, "ack")
                     await self.handle_command(cmd)
+                    await self.ack_command(cmd, "complete")
+                return True
         except Exception as e:
             print(f"! Poll Error: {e}")
+        return False
+
+    async def ack_command(self, cmd, stage):
+        """Report command progress so the server stops redelivering it"""
+        try:
+            await self.client.post(f"{self.api_url}/commands/{cmd['command_id']}/{stage}", json={"status": "completed"})
+        except Exception as e:
+            print(f"Failed to {stage} command: {e}")
 
     async def handle_command(self, cmd):
         ctype = cmd['command_type']
@@ -146,25 +164,32 @@ class MockDevice:
                 })
             except: pass
 
-    async def run(self):
-        await self.log("[SYS] Mock System Online")
+    async def command_loop(self):
+        while True:
+            ok = await self.poll_commands()
+            # Long-poll returns as soon as a command lands; only back off on errors or short polling
+            if not ok or self.wait <= 0:
+                await asyncio.sleep(2)
+
+    async def telemetry_loop(self):
         while True:
-            # Poll for commands
-            await self.poll_commands()
-            
             # Send heartbeat telemetry periodically (every loop for mock responsiveness)
             # In real firmware this is less frequent, but for UI testing we want live graphs
             await self.push_telemetry()
-            
             await asyncio.sleep(2)
 
+    async def run(self):
+        await self.log("[SYS] Mock System Online")
+        await asyncio.gather(self.command_loop(), self.telemetry_loop())
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--node", default="mock-node-001", help="Node ID to simulate")
     parser.add_argument("--api", default="http://localhost:8000/api/v1", help="API URL")
+    parser.add_argument("--wait", type=float, default=25, help="Command long-poll seconds (0 = poll every 2s)")
     args = parser.parse_args()
     
-    device = MockDevice(args.node, args.api)
+    device = MockDevice(args.node, args.api, args.wait)
     try:
         asyncio.run(device.run())
     except KeyboardInterrupt: